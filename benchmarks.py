@@ -0,0 +1,422 @@
+#!/usr/bin/env python
+'''Performance benchmarks for the radiation interception methods'''
+from __future__ import division
+import argparse
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+import numpy as np
+from npy_output import batch_chunk
+from parallel import (default_processes, map_chunks, row_chunks,
+                      shared_map_rows)
+from rad_competition_methods import (
+    BATCH_METHODS, SkyGrid, leave_one_out_transm, rad_ext_coeff_black_diff,
+    rad_ext_coeff_black_diff_array, rad_ext_coeff_black_diff_gauss,
+    rad_ext_coeff_black_diff_table, rad_intercpt_apsim, rad_intercpt_cycles,
+    rad_intercpt_sub_daily, rad_intercpt_sub_daily_species,
+    rad_intercpt_wallace)
+
+SPECIES_COUNTS = (2, 10, 100, 1000, 10000)
+# Suite workloads: canopies per batched call, species per canopy, solar
+# angles and leaf area index values of sub daily and diffuse runs
+BATCH_SIZES = (1000, 10000, 100000, 1000000)
+SUITE_SPECIES_COUNTS = (2, 10, 100, 1000)
+ANGLE_COUNTS = (10, 19, 91, 181)
+LAI_COUNTS = (10, 100, 1000)
+# Canopies of the parallel executor runs, per process count
+PARALLEL_BATCH_SIZE = 1000000
+# Largest workload of each kind with quick=True
+QUICK_BATCH_SIZE = 10000
+QUICK_SPECIES_COUNT = 100
+QUICK_GRID_SIZE = 100
+# Timed runs per suite record, summarised by their median
+SUITE_REPEAT = 5
+# Relative growth of time or peak memory reported as a regression, and
+# multiple of the relative spread of the timed runs of both suites that
+# time must also exceed. Medians of separate runs of the same code differ
+# by up to about 2x on shared machines, so tighter gates need a quiet one.
+DEFAULT_TOLERANCE = 1.5
+NOISE_FACTOR = 3.
+
+
+def leave_one_out_transm_quadratic(k_lai_prod):
+    """(array) -> array
+
+    Return all species but ith transmission by multiplying the N - 1 other
+    transmissions for every species, as rad_intercpt_cycles used to do. Kept
+    only as the reference the linear version is timed against.
+
+    k_lai_prod: extinction coefficient and leaf area index product
+
+    >>> leave_one_out_transm_quadratic(np.array([0.5, 1., 2.]))
+    array([0.04978707, 0.082085  , 0.22313016])
+    """
+    number_species = len(k_lai_prod)
+    transm_rad = np.exp(-np.asarray(k_lai_prod))
+    transm_rad_others = np.ones(number_species)
+    for i in range(number_species):
+        for j in range(number_species):
+            if j != i:
+                transm_rad_others[i] *= transm_rad[j]
+    return transm_rad_others
+
+
+def best_time(func, repeat=3, number=None):
+    """(function, int, int) -> float
+
+    Return the best time per call [s] of func over repeat runs. When number
+    is not given it is chosen so that each run takes at least 0.2 s.
+    """
+    timer = timeit.Timer(func)
+    if number is None:
+        number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def bench_leave_one_out(species_counts=SPECIES_COUNTS, max_quadratic=1000,
+                        seed=0):
+    """(tuple, int, int) -> list
+
+    Return one (number_species, quadratic [s], linear [s], cycles [s]) row
+    per species count. quadratic is None above max_quadratic species, where
+    the reference loop takes too long to be worth waiting for.
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for number_species in species_counts:
+        extinction_coeff = rng.uniform(0.3, 0.8, number_species)
+        leaf_area_index = rng.uniform(0.01, 0.1, number_species)
+        height = rng.uniform(0.1, 2, number_species)
+        k_lai_prod = extinction_coeff * leaf_area_index
+        crop_list = np.column_stack([extinction_coeff, leaf_area_index,
+                                     height]).tolist()
+        if number_species <= max_quadratic:
+            quadratic = best_time(
+                lambda: leave_one_out_transm_quadratic(k_lai_prod), number=1)
+        else:
+            quadratic = None
+        linear = best_time(lambda: leave_one_out_transm(k_lai_prod))
+        cycles = best_time(lambda: rad_intercpt_cycles(crop_list), number=1)
+        rows.append((number_species, quadratic, linear, cycles))
+    return rows
+
+
+def print_leave_one_out(rows):
+    """(list) -> None
+
+    Print bench_leave_one_out rows as a table
+    """
+    print('%8s %14s %14s %14s' % ('species', 'quadratic [s]', 'linear [s]',
+                                  'cycles [s]'))
+    for number_species, quadratic, linear, cycles in rows:
+        print('%8d %14s %14.3e %14.3e' % (
+            number_species,
+            '-' if quadratic is None else '%.3e' % quadratic,
+            linear, cycles))
+
+
+def median_time(func, repeat=SUITE_REPEAT, number=None):
+    """(function, int, int) -> (float, float)
+
+    Return the median time per call [s] of func over repeat runs, and the
+    spread of the runs: their median absolute deviation over the median.
+    When number is not given it is chosen so that each run takes at least
+    0.2 s.
+    """
+    timer = timeit.Timer(func)
+    if number is None:
+        number, _ = timer.autorange()
+    seconds = np.array(timer.repeat(repeat=repeat, number=number)) / number
+    median = np.median(seconds)
+    return float(median), float(np.median(np.abs(seconds - median)) / median)
+
+
+def measure(func, repeat=SUITE_REPEAT, number=None):
+    """(function, int, int) -> (float, float, int)
+
+    Return the median time per call [s] of func and its spread, see
+    median_time, and the peak memory [bytes] traced by tracemalloc during
+    one extra call
+    """
+    seconds, spread = median_time(func, repeat, number)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, spread, peak_memory
+
+
+def bench_record(benchmark, workload, size, func, items=1, number=None):
+    """(str, str, int, function, int, int) -> dict
+
+    Return a suite record of one timed workload, with throughput in items
+    (calls, canopies or grid points) per second
+    """
+    seconds, spread, peak_memory = measure(func, number=number)
+    return {'benchmark': benchmark,
+            'workload': workload,
+            'size': size,
+            'seconds_per_call': seconds,
+            'seconds_spread': spread,
+            'throughput': items / seconds,
+            'peak_memory_bytes': peak_memory}
+
+
+def random_canopies(rng, number_canopies, number_species):
+    """(Generator, int, int) -> (array, array, array)
+
+    Return random extinction coefficient, leaf area index and height arrays
+    [number_canopies, number_species]
+    """
+    shape = (number_canopies, number_species)
+    return (rng.uniform(0.3, 0.8, shape), rng.uniform(0.1, 3, shape),
+            rng.uniform(0.1, 2, shape))
+
+
+def bench_single_calls():
+    """() -> list
+
+    Return suite records of one call of every method on a two species
+    canopy
+    """
+    crop_list = [[0.5, 1.2, 0.8], [0.6, 1.5, 1.1]]
+    angles_deg = np.linspace(0, 90, 19)
+    leaf_area_index = np.linspace(0.005, 3.5, 10)
+    return [
+        bench_record('rad_intercpt_cycles', 'single', 2,
+                     lambda: rad_intercpt_cycles(crop_list)),
+        bench_record('rad_intercpt_apsim', 'single', 2,
+                     lambda: rad_intercpt_apsim(crop_list)),
+        bench_record('rad_intercpt_wallace', 'single', 2,
+                     lambda: rad_intercpt_wallace(crop_list)),
+        bench_record('rad_intercpt_sub_daily', 'single', 10,
+                     lambda: rad_intercpt_sub_daily(
+                         0.75, 101.3, 0.8, leaf_area_index, 0.5, 2,
+                         angles_deg)),
+        bench_record('rad_ext_coeff_black_diff', 'single', 1,
+                     lambda: rad_ext_coeff_black_diff(1, 2))]
+
+
+def bench_batches(batch_sizes=BATCH_SIZES, seed=0):
+    """(tuple, int) -> list
+
+    Return suite records of every batched method on batch_sizes two
+    species canopies, throughput in canopies per second
+    """
+    rng = np.random.default_rng(seed)
+    records = []
+    for number_canopies in batch_sizes:
+        inputs = random_canopies(rng, number_canopies, 2)
+        for name in sorted(BATCH_METHODS):
+            method = BATCH_METHODS[name]
+            records.append(bench_record(
+                'rad_intercpt_%s_batch' % name, 'batch', number_canopies,
+                lambda: method(*inputs), items=number_canopies))
+    return records
+
+
+def bench_species(species_counts=SUITE_SPECIES_COUNTS, seed=0):
+    """(tuple, int) -> list
+
+    Return suite records of the cycles and apsim methods on one canopy of
+    every species count
+    """
+    rng = np.random.default_rng(seed)
+    records = []
+    for number_species in species_counts:
+        extinction_coeff, leaf_area_index, height = random_canopies(
+            rng, 1, number_species)
+        crop_list = np.column_stack([extinction_coeff[0], leaf_area_index[0],
+                                     height[0]]).tolist()
+        records.append(bench_record('rad_intercpt_cycles', 'species',
+                                    number_species,
+                                    lambda: rad_intercpt_cycles(crop_list)))
+        records.append(bench_record('rad_intercpt_apsim', 'species',
+                                    number_species,
+                                    lambda: rad_intercpt_apsim(crop_list)))
+    return records
+
+
+def bench_grids(angle_counts=ANGLE_COUNTS, lai_counts=LAI_COUNTS):
+    """(tuple, tuple) -> list
+
+    Return suite records of the sub daily method on angle and leaf area
+    index grids, and of the diffuse extinction coefficient functions on
+    leaf area index grids, throughput in grid points per second
+    """
+    records = []
+    for number_angles in angle_counts:
+        sky = SkyGrid(np.linspace(0, 90, number_angles), 101.3, 0.75)
+        for number_lai in lai_counts:
+            leaf_area_index = np.linspace(0.005, 3.5, number_lai)[:, None]
+            records.append(bench_record(
+                'rad_intercpt_sub_daily', 'grid %d angles' % number_angles,
+                number_lai,
+                lambda: rad_intercpt_sub_daily_species(
+                    0.8, leaf_area_index, [0.5, 2], sky),
+                items=number_angles * number_lai))
+    for number_lai in lai_counts:
+        leaf_area_index = np.linspace(0.005, 3.5, number_lai)
+        records.append(bench_record(
+            'rad_ext_coeff_black_diff', 'grid', number_lai,
+            lambda: [rad_ext_coeff_black_diff(1, lai)
+                     for lai in leaf_area_index], items=number_lai))
+        for func in (rad_ext_coeff_black_diff_array,
+                     rad_ext_coeff_black_diff_table,
+                     rad_ext_coeff_black_diff_gauss):
+            records.append(bench_record(
+                func.__name__, 'grid', number_lai,
+                lambda: func(1, leaf_area_index), items=number_lai))
+    return records
+
+
+def bench_parallel(number_canopies=PARALLEL_BATCH_SIZE, process_counts=None,
+                   seed=0):
+    """(int, tuple, int) -> list
+
+    Return suite records of the cycles batch method on number_canopies two
+    species canopies across process pools of each size, with pickled
+    chunks (map_chunks) and with shared memory (shared_map_rows),
+    throughput in canopies per second
+    """
+    if process_counts is None:
+        process_counts = tuple(sorted(set([1, 2, default_processes()])))
+    inputs = random_canopies(np.random.default_rng(seed), number_canopies, 2)
+    method = BATCH_METHODS['cycles']
+    chunk_size = 16384
+    chunks = [('cycles',) + tuple(array[start:stop] for array in inputs)
+              for start, stop in row_chunks(number_canopies, chunk_size)]
+    records = []
+    for processes in process_counts:
+        records.append(bench_record(
+            'map_chunks cycles', 'processes', processes,
+            lambda: map_chunks(batch_chunk, chunks, processes),
+            items=number_canopies, number=1))
+        records.append(bench_record(
+            'shared_map_rows cycles', 'processes', processes,
+            lambda: shared_map_rows(method, inputs, processes=processes),
+            items=number_canopies, number=1))
+    return records
+
+
+def run_suite(quick=False):
+    """(bool) -> dict
+
+    Return the platform and the records of every suite workload; quick
+    leaves out the largest workloads
+    """
+    def sizes(values, largest):
+        return tuple(value for value in values
+                     if not quick or value <= largest)
+    records = (bench_single_calls() +
+               bench_batches(sizes(BATCH_SIZES, QUICK_BATCH_SIZE)) +
+               bench_species(sizes(SUITE_SPECIES_COUNTS,
+                                   QUICK_SPECIES_COUNT)) +
+               bench_grids(lai_counts=sizes(LAI_COUNTS, QUICK_GRID_SIZE)) +
+               bench_parallel(min(PARALLEL_BATCH_SIZE, QUICK_BATCH_SIZE)
+                              if quick else PARALLEL_BATCH_SIZE))
+    return {'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpu_count': default_processes(),
+            'results': records}
+
+
+def compare_suites(baseline, current, tolerance=DEFAULT_TOLERANCE,
+                   noise_factor=NOISE_FACTOR):
+    """(dict, dict, float, float) -> list
+
+    Return (benchmark, workload, size, time ratio, memory ratio) of the
+    records present in both suites whose time or peak memory grew by more
+    than tolerance, current over baseline. Time must also grow by more
+    than noise_factor times the summed seconds_spread of both records.
+    Records of process pools larger than the cpu_count of either suite
+    are left out, their times being mostly scheduling noise.
+
+    >>> record = {'benchmark': 'b', 'workload': 'w', 'size': 1,
+    ...           'seconds_per_call': 1., 'seconds_spread': 0.01,
+    ...           'peak_memory_bytes': 100}
+    >>> slower = dict(record, seconds_per_call=3.)
+    >>> compare_suites({'results': [record]}, {'results': [slower]})
+    [('b', 'w', 1, 3.0, 1.0)]
+    >>> noisy = dict(slower, seconds_spread=0.7)
+    >>> compare_suites({'results': [record]}, {'results': [noisy]})
+    []
+    """
+    def key(record):
+        return record['benchmark'], record['workload'], record['size']
+    cpu_count = min(baseline.get('cpu_count', default_processes()),
+                    current.get('cpu_count', default_processes()))
+    baseline_records = dict((key(record), record)
+                            for record in baseline['results'])
+    regressions = []
+    for record in current['results']:
+        if key(record) not in baseline_records:
+            continue
+        if record['workload'] == 'processes' and record['size'] > cpu_count:
+            continue
+        base = baseline_records[key(record)]
+        time_ratio = record['seconds_per_call'] / base['seconds_per_call']
+        memory_ratio = (record['peak_memory_bytes'] /
+                        max(base['peak_memory_bytes'], 1))
+        noise = noise_factor * (base.get('seconds_spread', 0.) +
+                                record.get('seconds_spread', 0.))
+        if (time_ratio > 1 + max(tolerance, noise) or
+                memory_ratio > 1 + tolerance):
+            regressions.append(key(record) + (time_ratio, memory_ratio))
+    return regressions
+
+
+def main(argv=None):
+    """Command line entry point: run the suite and write JSON records
+
+    python benchmarks.py [-o FILE] [--quick] [--compare BASELINE]
+    python benchmarks.py --leave-one-out
+
+    Return exit status 1 when --compare finds regressions, else 0
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark the radiation interception methods')
+    parser.add_argument('-o', '--output', default=None,
+                        help='JSON output file, default standard output')
+    parser.add_argument('--quick', action='store_true',
+                        help='leave out the largest workloads')
+    parser.add_argument('--compare', default=None,
+                        help='baseline JSON file to report regressions of')
+    parser.add_argument('--tolerance', type=float,
+                        default=DEFAULT_TOLERANCE,
+                        help='relative slowdown reported, default %g' %
+                        DEFAULT_TOLERANCE)
+    parser.add_argument('--leave-one-out', action='store_true',
+                        help='print the leave one out scaling table only')
+    args = parser.parse_args(argv)
+    if args.leave_one_out:
+        print_leave_one_out(bench_leave_one_out())
+        return 0
+    suite = run_suite(args.quick)
+    if args.output is None:
+        json.dump(suite, sys.stdout, indent=1)
+        print('')
+    else:
+        with open(args.output, 'w') as output:
+            json.dump(suite, output, indent=1)
+    if args.compare is not None:
+        with open(args.compare) as baseline:
+            regressions = compare_suites(json.load(baseline), suite,
+                                         args.tolerance)
+        for benchmark, workload, size, time_ratio, memory_ratio in \
+                regressions:
+            sys.stderr.write('%s %s %d: time x%.2f, memory x%.2f\n' % (
+                benchmark, workload, size, time_ratio, memory_ratio))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
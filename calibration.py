@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+'''Calibration of extinction coefficients against observed interception'''
+from __future__ import division
+import itertools
+import numpy as np
+import rad_competition_methods
+from rad_competition_methods import BATCH_METHODS, JACOBIAN_METHODS
+from parallel import default_processes, row_chunks
+from result_store import cached_map
+
+# Most candidate parameter sets evaluated per batched call
+CANDIDATES_PER_CHUNK = 4096
+
+
+def load_observations(fname='barillot_data.csv',
+                      lai_columns=('pea_lai', 'wheat_lai'),
+                      height_columns=('pea_height', 'wheat_height'),
+                      intercpt_columns=('Pea_LI', 'wheat_LI')):
+    """(str, tuple, tuple, tuple) -> (array, array, array)
+
+    Return leaf area index, height and observed interception [days,
+    n_species] of an observation file with one header line. Defaults read
+    the pea/wheat mixture of Barillot et al.
+
+    >>> leaf_area_index, height, observed = load_observations()
+    >>> observed.shape
+    (37, 2)
+    """
+    with open(fname) as records:
+        header = [name.strip() for name in
+                  records.readline().strip().split(',')]
+    data = np.loadtxt(fname, dtype='float', delimiter=',', skiprows=1,
+                      ndmin=2)
+
+    def columns(names):
+        return data[:, [header.index(name) for name in names]]
+    return columns(lai_columns), columns(height_columns), \
+        columns(intercpt_columns)
+
+
+def interception_rmse(extinction_coeff, leaf_area_index, height, observed,
+                      method='cycles'):
+    """(array, array, array, array, str) -> array
+
+    Return root mean square error between simulated and observed
+    interception, over days and species, of each candidate set of
+    extinction coefficients, all candidates in one batched call
+
+    extinction_coeff: candidate extinction coefficients [n_candidates,
+     n_species]
+    leaf_area_index: [days, n_species]
+    height: [days, n_species]
+    observed: observed interception [days, n_species]
+    method: 'cycles', 'apsim' or 'wallace', see BATCH_METHODS
+
+    >>> leaf_area_index, height, observed = load_observations()
+    >>> interception_rmse([[0.540909090909, 0.510606060606]],
+    ...                   leaf_area_index, height, observed)
+    array([0.04015186])
+    """
+    extinction_coeff = np.asarray(extinction_coeff, dtype=float)
+    simulated = BATCH_METHODS[method](extinction_coeff[:, None, :],
+                                      leaf_area_index[None, :, :],
+                                      height[None, :, :])
+    return np.sqrt(((simulated - observed) ** 2).mean(axis=(1, 2)))
+
+
+def _interception_rmse_chunk(args):
+    """Process pool entry point of interception_rmse"""
+    return interception_rmse(*args)
+
+
+def candidate_chunk_size(number_candidates, processes=None):
+    """(int, int) -> int
+
+    Return the candidates per chunk that give every worker process a share
+    of number_candidates, at most CANDIDATES_PER_CHUNK
+
+    >>> candidate_chunk_size(441, 4), candidate_chunk_size(10 ** 6, 4)
+    (111, 4096)
+    """
+    if processes is None:
+        processes = default_processes()
+    processes = max(processes, 1)
+    return max(1, min(CANDIDATES_PER_CHUNK,
+                      (number_candidates + processes - 1) // processes))
+
+
+def calibrate_extinction_coeff(leaf_area_index, height, observed,
+                               method='cycles', k_min=0.1, k_max=1.5,
+                               grid_size=21, refinements=4, processes=None,
+                               store=None):
+    """(array, array, array, str, float, float, int, int, int, ResultStore)
+    -> (array, float)
+
+    Return the per species extinction coefficients minimizing
+    interception_rmse, and that error. Every species gets grid_size values
+    between k_min and k_max, and all combinations are evaluated in batched
+    chunks split across a process pool (see candidate_chunk_size). The
+    grid is then narrowed to one step around the best set, refinements
+    times.
+
+    method selects the height weighting: 'cycles' (height dominance),
+    'wallace' (height fraction, two species) or 'apsim' (no height effect).
+    Chunk errors found in store, a result_store.ResultStore, are read
+    instead of computed.
+
+    >>> leaf_area_index, height, observed = load_observations()
+    >>> k, rmse = calibrate_extinction_coeff(leaf_area_index, height,
+    ...                                      observed, processes=1)
+    >>> k.round(3), round(rmse, 4)
+    (array([0.516, 0.46 ]), 0.0378)
+    """
+    assert 0 < k_min < k_max
+    assert grid_size > 1
+    number_species = observed.shape[1]
+    lower = np.full(number_species, float(k_min))
+    upper = np.full(number_species, float(k_max))
+    best_k, best_rmse = None, np.inf
+    for _ in range(refinements + 1):
+        grids = [np.linspace(low, high, grid_size)
+                 for low, high in zip(lower, upper)]
+        candidates = np.array(list(itertools.product(*grids)))
+        chunks = [(candidates[start:stop], leaf_area_index, height,
+                   observed, method)
+                  for start, stop in row_chunks(
+                      len(candidates),
+                      candidate_chunk_size(len(candidates), processes))]
+        rmse = np.concatenate(cached_map(
+            store, _interception_rmse_chunk, chunks, processes,
+            code=(interception_rmse, rad_competition_methods)))
+        if rmse.min() < best_rmse:
+            best_k, best_rmse = candidates[rmse.argmin()], rmse.min()
+        # Narrow the grid to one step around the best set
+        step = (upper - lower) / (grid_size - 1)
+        lower = np.maximum(best_k - step, k_min)
+        upper = np.minimum(best_k + step, k_max)
+    return best_k, float(best_rmse)
+
+
+def fit_extinction_coeff(leaf_area_index, height, observed, initial_k,
+                         method='cycles', max_iterations=50, tol=1e-10):
+    """(array, array, array, array, str, int, float) -> (array, float)
+
+    Return the per species extinction coefficients minimizing
+    interception_rmse, and that error, by damped Gauss-Newton iterations
+    from initial_k using the closed form jacobian of the method. Each
+    iteration costs one model evaluation instead of a grid of them.
+
+    method: 'cycles' or 'apsim', see JACOBIAN_METHODS
+
+    >>> leaf_area_index, height, observed = load_observations()
+    >>> k, rmse = fit_extinction_coeff(leaf_area_index, height, observed,
+    ...                                [0.5, 0.5])
+    >>> k.round(3), round(rmse, 4)
+    (array([0.516, 0.46 ]), 0.0378)
+    """
+    jacobian = JACOBIAN_METHODS[method]
+    extinction_coeff = np.array(initial_k, dtype=float)
+    damping = 1e-3
+    rad_intercpt, d_k = jacobian(extinction_coeff, leaf_area_index,
+                                 height)[:2]
+    residuals = (rad_intercpt - observed).ravel()
+    for _ in range(max_iterations):
+        # Residuals of every day and species against every coefficient
+        d_residuals = d_k.reshape(-1, len(extinction_coeff))
+        normal = d_residuals.T.dot(d_residuals)
+        gradient = d_residuals.T.dot(residuals)
+        step = np.linalg.solve(normal + damping * np.diag(np.diag(normal)),
+                               -gradient)
+        trial_k = np.maximum(extinction_coeff + step, 1e-6)
+        trial_intercpt, trial_d_k = jacobian(trial_k, leaf_area_index,
+                                             height)[:2]
+        trial_residuals = (trial_intercpt - observed).ravel()
+        if trial_residuals.dot(trial_residuals) < residuals.dot(residuals):
+            converged = np.abs(trial_k - extinction_coeff).max() < tol
+            extinction_coeff, d_k = trial_k, trial_d_k
+            residuals = trial_residuals
+            damping /= 10
+            if converged:
+                break
+        else:
+            damping *= 10
+    return extinction_coeff, float(np.sqrt(residuals.dot(residuals) /
+                                           residuals.size))
+
+
+def calibrate_methods(leaf_area_index, height, observed,
+                      methods=('cycles', 'wallace', 'apsim'), **kwargs):
+    """(array, array, array, tuple) -> dict
+
+    Return {method: (extinction coefficients, rmse)} calibrating each
+    method, i.e. each height weighting behaviour, with
+    calibrate_extinction_coeff
+    """
+    return dict((method, calibrate_extinction_coeff(
+        leaf_area_index, height, observed, method=method, **kwargs))
+        for method in methods)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
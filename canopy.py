@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+'''Canopy containers: compact species arrays and incremental canopy state'''
+from __future__ import division
+import numpy as np
+from rad_competition_methods import rad_intercpt_cycles_partition
+
+
+class Species(object):
+    """Record view of one species of a Canopy, reading and writing the
+    canopy arrays in place
+
+    Indexing as [extinction_coeff, leaf_area_index, height] keeps it usable
+    wherever a crop_list entry is expected.
+    """
+    __slots__ = ('canopy', 'index')
+
+    def __init__(self, canopy, index):
+        self.canopy = canopy
+        self.index = index
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, field):
+        return (self.extinction_coeff, self.leaf_area_index,
+                self.height)[field]
+
+    def __repr__(self):
+        return 'Species(k=%g, lai=%g, height=%g, x_area_ratio=%g)' % (
+            self.extinction_coeff, self.leaf_area_index, self.height,
+            self.x_area_ratio)
+
+    def _field(row):
+        def get(self):
+            return float(self.canopy.data[row, self.index])
+
+        def set(self, value):
+            self.canopy.data[row, self.index] = value
+        return property(get, set)
+
+    extinction_coeff = _field(0)
+    leaf_area_index = _field(1)
+    height = _field(2)
+    x_area_ratio = _field(3)
+    del _field
+
+
+class Canopy(object):
+    """Species of a canopy stored as contiguous float arrays: one row of a
+    (4, n_species) array each for extinction_coeff, leaf_area_index, height
+    and x_area_ratio
+
+    extinction_coeff: rad extinction coefficient of each species
+    leaf_area_index: leaf area index [m2/m2] of each species
+    height: plant height of each species
+    x_area_ratio: leaf angle distribution parameter of each species, only
+     needed by the sub daily engine
+
+    rad_intercpt_cycles, rad_intercpt_wallace and rad_intercpt_apsim read
+    the rows directly (see species_arrays) and rad_intercpt_sub_daily_canopy
+    takes it as is, so no per call list is built. canopy[i] is a Species
+    view.
+
+    >>> from rad_competition_methods import (rad_intercpt_cycles,
+    ...     rad_intercpt_wallace, rad_intercpt_apsim)
+    >>> canopy = Canopy([0.5, 0.6, 0.7], [1, 1.2, 1.4], [0.5, 1, 1.5])
+    >>> rad_intercpt_cycles(canopy)
+    array([0.13822214, 0.29363746, 0.45733724])
+    >>> rad_intercpt_wallace(Canopy([0.5, 0.7], [1, 3], [1, 1]))
+    [0.22082609516300733, 0.7049003266226588]
+    >>> rad_intercpt_apsim(Canopy([0.5, 0.7], [1, 3]))
+    array([0.17802431, 0.74770211])
+    >>> canopy[0].height = 1
+    >>> canopy.height
+    array([1. , 1. , 1.5])
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, extinction_coeff, leaf_area_index, height=None,
+                 x_area_ratio=None):
+        number_species = len(extinction_coeff)
+        self.data = np.full((4, number_species), np.nan)
+        self.data[0] = extinction_coeff
+        self.data[1] = leaf_area_index
+        if height is not None:
+            self.data[2] = height
+        if x_area_ratio is not None:
+            self.data[3] = x_area_ratio
+
+    @classmethod
+    def from_crop_list(cls, crop_list):
+        """(list) -> Canopy
+
+        Return a Canopy from [extinction_coeff, leaf_area_index, height
+        [, x_area_ratio]] lists
+        """
+        inputs = np.asarray(crop_list, dtype=float)
+        return cls(*[inputs[:, i] for i in range(inputs.shape[1])])
+
+    @property
+    def extinction_coeff(self):
+        return self.data[0]
+
+    @property
+    def leaf_area_index(self):
+        return self.data[1]
+
+    @property
+    def height(self):
+        return self.data[2]
+
+    @property
+    def x_area_ratio(self):
+        return self.data[3]
+
+    def __len__(self):
+        return self.data.shape[1]
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError('species index out of range')
+        return Species(self, index % len(self))
+
+    def __iter__(self):
+        return (Species(self, i) for i in range(len(self)))
+
+
+class CanopyState(object):
+    """Canopy of species whose k, LAI and height change one at a time, with
+    the running sums rad_intercpt_cycles needs kept up to date
+
+    extinction_coeff: rad extinction coefficient of each species
+    leaf_area_index: leaf area index [m2/m2] of each species
+    height: plant height of each species
+
+    update_species changes one species in O(1): the total k * LAI, the
+    total height and the species transmissions are patched instead of
+    recomputed. interception() takes the total transmission and the
+    transmission of all species but ith from the running total k * LAI,
+    and runs one vectorized pass over the species with the
+    rad_intercpt_cycles_batch kernel (rad_intercpt_cycles_partition),
+    done only when results are asked for after a change. Running sums are
+    rebuilt by resum(), which is called every len(self) updates to stop
+    rounding drift, keeping updates O(1) amortized.
+
+    Reference: Camargo, G.G.T. 2014. Ph.D. Dissertation. Penn State University
+
+    >>> canopy = CanopyState([0.5, 0.6, 0.7], [1, 1.2, 1.4], [0.5, 1, 1.5])
+    >>> canopy.interception()
+    array([0.13822214, 0.29363746, 0.45733724])
+    >>> canopy.update_species(0, height=1)
+    >>> canopy.interception()
+    array([0.18575064, 0.26940821, 0.43403799])
+    """
+
+    def __init__(self, extinction_coeff, leaf_area_index, height):
+        self.extinction_coeff = np.array(extinction_coeff, dtype=float)
+        self.leaf_area_index = np.array(leaf_area_index, dtype=float)
+        self.height = np.array(height, dtype=float)
+        assert (self.extinction_coeff.shape == self.leaf_area_index.shape ==
+                self.height.shape)
+        assert self.extinction_coeff.ndim == 1
+        assert (self.extinction_coeff > 0).all()
+        assert (self.leaf_area_index > 0).all()
+        assert (self.height > 0).all()
+        self.resum()
+
+    def __len__(self):
+        return len(self.extinction_coeff)
+
+    def resum(self):
+        """Recompute the running sums from the species arrays"""
+        self.k_lai_prod = self.extinction_coeff * self.leaf_area_index
+        self.transm_rad = np.exp(-self.k_lai_prod)
+        self.k_lai_prod_sum = self.k_lai_prod.sum()
+        self.height_sum = self.height.sum()
+        self._updates = 0
+        self._rad_intercpt = None
+
+    def update_species(self, i, k=None, lai=None, height=None):
+        """(int, float, float, float) -> None
+
+        Change extinction coefficient, leaf area index and/or height of
+        species i
+        """
+        if k is not None:
+            assert k > 0
+            self.extinction_coeff[i] = k
+        if lai is not None:
+            assert lai > 0
+            self.leaf_area_index[i] = lai
+        if height is not None:
+            assert height > 0
+            self.height_sum += height - self.height[i]
+            self.height[i] = height
+        if k is not None or lai is not None:
+            k_lai_prod = self.extinction_coeff[i] * self.leaf_area_index[i]
+            self.k_lai_prod_sum += k_lai_prod - self.k_lai_prod[i]
+            self.k_lai_prod[i] = k_lai_prod
+            self.transm_rad[i] = np.exp(-k_lai_prod)
+        self._rad_intercpt = None
+        self._updates += 1
+        if self._updates >= len(self):
+            self.resum()
+
+    def interception(self):
+        """() -> array
+
+        Return rad intercepted on each species, same as rad_intercpt_cycles
+        """
+        if self._rad_intercpt is None:
+            height_dom = len(self) * self.height / self.height_sum
+            self._rad_intercpt = rad_intercpt_cycles_partition(
+                self.k_lai_prod, height_dom, self.k_lai_prod_sum,
+                self.transm_rad, np.exp(-self.k_lai_prod_sum),
+                np.exp(self.k_lai_prod - self.k_lai_prod_sum))
+        return self._rad_intercpt.copy()
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
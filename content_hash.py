@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+'''Canonical content hashes of inputs, results and code'''
+from __future__ import division
+import hashlib
+import inspect
+import numpy as np
+
+
+def _update(digest, obj):
+    """Feed obj to digest, tagging every value with its type so that e.g.
+    1, 1.0, '1' and [1] hash differently"""
+    if isinstance(obj, dict):
+        digest.update(b'dict%d' % len(obj))
+        for key in sorted(obj, key=repr):
+            _update(digest, key)
+            _update(digest, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b'seq%d' % len(obj))
+        for value in obj:
+            _update(digest, value)
+    elif isinstance(obj, np.ndarray) or isinstance(obj, np.generic):
+        value = np.ascontiguousarray(obj)
+        digest.update(('array%s%s' % (value.dtype.str,
+                                      value.shape)).encode())
+        digest.update(value.tobytes())
+    elif isinstance(obj, float):
+        digest.update(b'float' + np.float64(obj).tobytes())
+    elif isinstance(obj, (bool, int)):
+        digest.update(('%s%r' % (type(obj).__name__, obj)).encode())
+    elif isinstance(obj, str):
+        digest.update(b'str%d' % len(obj) + obj.encode())
+    elif obj is None:
+        digest.update(b'none')
+    else:
+        raise TypeError('Cannot hash %s' % type(obj).__name__)
+
+
+def content_hash(obj):
+    """(object) -> str
+
+    Return the sha256 hex digest of nested dicts, lists, tuples, numpy
+    arrays, numbers and strings. Dict order does not matter; array dtype
+    and shape do.
+
+    >>> content_hash({'k': [0.5, 0.6], 'lai': np.array([1., 2.])}) == \\
+    ...     content_hash({'lai': np.array([1., 2.]), 'k': [0.5, 0.6]})
+    True
+    >>> content_hash(np.array([1., 2.])) == content_hash(np.array([1, 2]))
+    False
+    """
+    digest = hashlib.sha256()
+    _update(digest, obj)
+    return digest.hexdigest()
+
+
+def source_hash(*objects):
+    """(function or module, ...) -> str
+
+    Return the sha256 hex digest of the source code of functions, classes
+    or modules, a version of the code that changes whenever it is edited
+
+    >>> source_hash(content_hash) == source_hash(content_hash)
+    True
+    >>> source_hash(content_hash) == source_hash(source_hash)
+    False
+    """
+    return content_hash([inspect.getsource(obj) for obj in objects])
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
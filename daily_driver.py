@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+'''Streaming daily simulation driver over weather/phenology time series'''
+from __future__ import division
+import itertools
+import numpy as np
+from rad_competition_methods import BATCH_METHODS
+
+# Number of daily records read and simulated at once
+DEFAULT_CHUNK_SIZE = 365
+
+
+def read_daily_records(fname, chunk_size=DEFAULT_CHUNK_SIZE, delimiter=','):
+    """(str, int, str) -> generator
+
+    Yield chunks of a daily records file with one header line as
+    {column name: array} dictionaries of at most chunk_size days. Only one
+    chunk is held in memory at a time. When a column name is repeated the
+    first column is used.
+
+    fname: csv file, e.g. barillot_data.csv
+    chunk_size: number of days per chunk
+    delimiter: column delimiter
+
+    >>> chunks = read_daily_records('barillot_data.csv', chunk_size=30)
+    >>> [len(chunk['thermal_time']) for chunk in chunks]
+    [30, 7]
+    """
+    assert chunk_size > 0
+    with open(fname) as records:
+        header = records.readline().strip().split(delimiter)
+        columns = {}
+        for i, name in enumerate(header):
+            columns.setdefault(name.strip(), i)
+        while True:
+            lines = list(itertools.islice(records, chunk_size))
+            if not lines:
+                break
+            data = np.loadtxt(lines, dtype='float', delimiter=delimiter,
+                              ndmin=2)
+            yield dict((name, data[:, i]) for name, i in columns.items())
+
+
+def simulate_daily(records, lai_columns, height_columns, extinction_coeff,
+                   method='cycles'):
+    """(iterable, list, list, array, str) -> generator
+
+    Yield (chunk, rad_intercpt) for every chunk of daily records, with
+    rad_intercpt the radiation intercepted by each species on each day
+    [days, n_species]. Each chunk is computed with one call of the batched
+    method.
+
+    records: chunks of {column name: array}, e.g. from read_daily_records
+    lai_columns: leaf area index column of each species
+    height_columns: height column of each species, None for 'apsim'
+    extinction_coeff: rad extinction coefficient of each species
+    method: 'cycles', 'apsim' or 'wallace', see BATCH_METHODS, or a
+     function called as method(extinction_coeff, leaf_area_index, height)
+
+    >>> results = simulate_daily(
+    ...     read_daily_records('barillot_data.csv', chunk_size=30),
+    ...     ['pea_lai', 'wheat_lai'], ['pea_height', 'wheat_height'],
+    ...     [0.540909090909, 0.510606060606])
+    >>> chunk, rad_intercpt = next(results)
+    >>> rad_intercpt[:2]
+    array([[0.00812316, 0.01536795],
+           [0.01625203, 0.00768927]])
+    """
+    batch_method = BATCH_METHODS.get(method, method)
+    extinction_coeff = np.asarray(extinction_coeff, dtype=float)
+    for chunk in records:
+        leaf_area_index = np.column_stack([chunk[name]
+                                           for name in lai_columns])
+        if height_columns is None:
+            height = None
+        else:
+            height = np.column_stack([chunk[name] for name in height_columns])
+        yield chunk, batch_method(extinction_coeff, leaf_area_index, height)
+
+
+def simulate_daily_file(fname, lai_columns, height_columns, extinction_coeff,
+                        method='cycles', chunk_size=DEFAULT_CHUNK_SIZE):
+    """(str, list, list, array, str, int) -> generator
+
+    Yield (chunk, rad_intercpt) for a daily records file, reading and
+    simulating chunk_size days at a time, see simulate_daily
+
+    >>> for chunk, rad_intercpt in simulate_daily_file(
+    ...         'barillot_data.csv', ['pea_lai', 'wheat_lai'], None,
+    ...         [0.5, 0.5], method='apsim', chunk_size=30):
+    ...     print(rad_intercpt.shape)
+    (30, 2)
+    (7, 2)
+    """
+    return simulate_daily(read_daily_records(fname, chunk_size),
+                          lai_columns, height_columns, extinction_coeff,
+                          method)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
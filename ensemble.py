@@ -0,0 +1,438 @@
+#!/usr/bin/env python
+'''Ensemble runner: seasonal interception of many sites, years and cropping
+scenarios, checkpointed so that an interrupted run resumes where it
+stopped'''
+from __future__ import division
+import argparse
+import calendar
+import csv
+import json
+import os
+import numpy as np
+from rad_competition_methods import (BATCH_METHODS, opt_air_mass_array,
+                                     rad_intercpt_sub_daily_species)
+from solar_geometry import season_sky_grid
+from parallel import imap_chunks
+from content_hash import content_hash
+
+# Columns read as text, all others as numbers
+TEXT_COLUMNS = ('site', 'scenario', 'method')
+# Extraterrestrial solar flux on a surface perpendicular to the beam
+# [W m-2], Campbell and Norman (1998) Ch. 11
+SOLAR_CONSTANT = 1360.
+# Scale height of atmospheric pressure with elevation [m], Campbell and
+# Norman (1998) Eq. 3.7
+PRESSURE_SCALE_HEIGHT = 8200.
+SEA_LEVEL_PRESS = 101.3
+DEFAULT_LEAF_TRANSM = 0.8
+DEFAULT_STEP_HOURS = 1.
+OUTPUT_COLUMNS = ('site', 'year', 'scenario', 'species', 'days',
+                  'incident_rad', 'rad_intercpt', 'intercpt_fraction')
+
+
+def read_table(fname):
+    """(str) -> list
+
+    Return the rows of a csv file with one header line as dictionaries,
+    TEXT_COLUMNS as strings and empty cells left out
+    """
+    with open(fname) as table:
+        rows = []
+        for row in csv.DictReader(table):
+            rows.append(dict((name.strip(),
+                              value.strip() if name.strip() in TEXT_COLUMNS
+                              else float(value))
+                             for name, value in row.items()
+                             if value is not None and value.strip()))
+        return rows
+
+
+def site_pressure(site):
+    """(dict) -> float
+
+    Return the atmospheric pressure [kPa] of a site row, its atm_press or
+    else estimated from its elevation [m]
+
+    Reference: Campbell, G. S., and J. M. Norman. 1998. Introduction to
+     environmental biophysics. Springer, New York. Eq. 3.7
+
+    >>> round(site_pressure({'elevation': 1000.}), 2)
+    89.67
+    """
+    if 'atm_press' in site:
+        return site['atm_press']
+    return float(SEA_LEVEL_PRESS * np.exp(-site['elevation'] /
+                                          PRESSURE_SCALE_HEIGHT))
+
+
+def season_days(start_day, end_day, year):
+    """(int, int, int) -> array
+
+    Return the days of year of a season from start_day to end_day, both
+    included; an end_day before start_day ends the season in the next year
+
+    >>> season_days(364, 2, 2020)
+    array([364, 365, 366,   1,   2])
+    """
+    year_length = 366 if calendar.isleap(year) else 365
+    if end_day >= start_day:
+        return np.arange(start_day, end_day + 1)
+    return np.concatenate([np.arange(start_day, year_length + 1),
+                           np.arange(1, end_day + 1)])
+
+
+def scenario_species(scenario):
+    """(dict) -> int
+
+    Return the number of species of a scenario row, i.e. of its lai_max_1,
+    lai_max_2, ... columns
+
+    >>> scenario_species({'lai_max_1': 4., 'lai_max_2': 3.})
+    2
+    """
+    number_species = 0
+    while 'lai_max_%d' % (number_species + 1) in scenario:
+        number_species += 1
+    assert number_species > 0, "Scenarios need lai_max_1, lai_max_2, ..."
+    return number_species
+
+
+def species_values(scenario, name, number_species):
+    """(dict, str, int) -> array
+
+    Return the name_1, name_2, ... values of a scenario row
+
+    >>> species_values({'lai_max_1': 4., 'lai_max_2': 3.}, 'lai_max', 2)
+    array([4., 3.])
+    """
+    return np.array([scenario['%s_%d' % (name, species + 1)]
+                     for species in range(number_species)])
+
+
+def canopy_development(scenario, number_days):
+    """(dict, int) -> (array, array)
+
+    Return the leaf area index and height of each species on each day of
+    the season [days, n_species]. Leaf area index rises and falls as a sine
+    over the season, peaking at lai_max_N mid season; height grows linearly
+    to height_max_N (default 1) at mid season and then stays.
+
+    >>> leaf_area_index, height = canopy_development(
+    ...     {'lai_max_1': 4., 'height_max_1': 2.}, 5)
+    >>> leaf_area_index[:, 0].round(2), height[:, 0]
+    (array([1.24, 3.24, 4.  , 3.24, 1.24]), array([0.4, 1.2, 2. , 2. , 2. ]))
+    """
+    number_species = scenario_species(scenario)
+    lai_max = species_values(scenario, 'lai_max', number_species)
+    if 'height_max_1' in scenario:
+        height_max = species_values(scenario, 'height_max', number_species)
+    else:
+        height_max = np.ones(number_species)
+    # Middle of each day as a fraction of the season
+    season_frac = ((np.arange(number_days) + 0.5) / number_days)[:, None]
+    leaf_area_index = lai_max * np.sin(np.pi * season_frac)
+    height = height_max * np.minimum(2 * season_frac, 1)
+    return leaf_area_index, height
+
+
+def incident_fraction(atm_press, solar_zenith_angle, atm_transm):
+    """(array, array, array) -> array
+
+    Return the fraction of the extraterrestrial flux reaching a horizontal
+    surface as beam plus diffuse radiation. Inputs are broadcast against
+    each other. Unlike SkyGrid.total_intercpt, which keeps the air mass of
+    solar_beam_fraction as interception weights of the methods, the
+    optical air mass is that of the zenith angle in degrees. The sun at or
+    below the horizon (90 deg, night steps of the grids) gives 0.
+
+    atm_press: [kPa]
+    solar_zenith_angle: [deg]
+    atm_transm: atmospheric transmission [0-1]
+
+    Reference: Campbell, G. S., and J. M. Norman. 1998. Introduction to
+     environmental biophysics. Springer, New York. Eq. 11.8, 11.11-11.13
+
+    >>> incident_fraction(101.3, np.array([0, 60, 90]), 0.75).round(4)
+    array([0.825 , 0.3469, 0.    ])
+    """
+    DEG_TO_RAD = np.pi / 180
+    solar_zenith_angle = np.asarray(solar_zenith_angle, dtype=float)
+    optical_air_mass = opt_air_mass_array(atm_press,
+                                          solar_zenith_angle)  # 11.12
+    solar_perpend_frac = np.asarray(atm_transm) ** optical_air_mass  # 11.11
+    diffuse_perpend_frac = 0.3 * (1 - solar_perpend_frac)  # 11.13
+    return np.where(solar_zenith_angle < 90,
+                    (solar_perpend_frac + diffuse_perpend_frac) *
+                    np.cos(solar_zenith_angle * DEG_TO_RAD), 0.)  # 11.8
+
+
+def run_task(site, year, scenario, step_hours=DEFAULT_STEP_HOURS):
+    """(dict, int, dict, float) -> dict
+
+    Return the seasonal interception of one (site, year, scenario) task:
+    the season's incident radiation [MJ m-2] and the radiation intercepted
+    by each species [MJ m-2], the sum over days of its daily interception
+    fraction times the day's incident radiation. Daily skies come from
+    solar_geometry.season_sky_grid at the site latitude, pressure and
+    transmission.
+
+    site: latitude [deg], atm_press [kPa] or elevation [m], atm_transm
+    scenario: method ('cycles', 'wallace', 'apsim' or 'sub_daily'),
+     start_day, end_day and per species columns lai_max_N, height_max_N
+     and extinction_coeff_N, or x_area_ratio_N and leaf_transm (default
+     DEFAULT_LEAF_TRANSM) for 'sub_daily'
+
+    >>> site = {'site': 'a', 'latitude': 40., 'elevation': 0.,
+    ...         'atm_transm': 0.75}
+    >>> scenario = {'scenario': 's', 'method': 'apsim', 'start_day': 100,
+    ...             'end_day': 250, 'lai_max_1': 4., 'lai_max_2': 2.,
+    ...             'extinction_coeff_1': 0.5, 'extinction_coeff_2': 0.5}
+    >>> result = run_task(site, 2001, scenario)
+    >>> round(result['incident_rad']), np.round(result['rad_intercpt'])
+    (4483, array([2352., 1176.]))
+    >>> polar_site = dict(site, latitude=80.)
+    >>> polar_scenario = dict(scenario, start_day=1, end_day=20)
+    >>> run_task(polar_site, 2001, polar_scenario)['incident_rad']
+    0.0
+    """
+    days = season_days(int(scenario['start_day']), int(scenario['end_day']),
+                       year)
+    sky = season_sky_grid(site['latitude'], days, site_pressure(site),
+                          site['atm_transm'], step_hours)
+    leaf_area_index, height = canopy_development(scenario, len(days))
+    number_species = leaf_area_index.shape[1]
+    if scenario['method'] == 'sub_daily':
+        x_area_ratio = species_values(scenario, 'x_area_ratio',
+                                      number_species)
+        rad_intercpt_frac = rad_intercpt_sub_daily_species(
+            scenario.get('leaf_transm', DEFAULT_LEAF_TRANSM),
+            leaf_area_index, x_area_ratio, sky)
+    else:
+        extinction_coeff = species_values(scenario, 'extinction_coeff',
+                                          number_species)
+        rad_intercpt_frac = BATCH_METHODS[scenario['method']](
+            np.broadcast_to(extinction_coeff, leaf_area_index.shape),
+            leaf_area_index, height)
+    # Incident radiation of each day [MJ m-2]
+    incident_rad = (SOLAR_CONSTANT * incident_fraction(
+        sky.atm_press, sky.angles_deg, sky.atm_transm).sum(axis=-1) *
+        step_hours * 3600 / 1e6)
+    return {'site': site['site'],
+            'year': year,
+            'scenario': scenario['scenario'],
+            'days': len(days),
+            'incident_rad': float(incident_rad.sum()),
+            'rad_intercpt': np.dot(incident_rad, rad_intercpt_frac).tolist()}
+
+
+def task_inputs_hash(site, scenario, step_hours):
+    """(dict, dict, float) -> str
+
+    Return the content hash of the inputs of a task, stored with its
+    checkpoint record so that results of edited site or scenario rows, or
+    of another time step, are not reused
+
+    >>> (task_inputs_hash({'site': 'a'}, {'scenario': 's'}, 1.) ==
+    ...  task_inputs_hash({'site': 'a'}, {'scenario': 's'}, 0.5))
+    False
+    """
+    return content_hash([site, scenario, float(step_hours)])
+
+
+def _run_task_chunk(args):
+    """Process pool entry point of run_task, adding the task_inputs_hash"""
+    site, year, scenario, step_hours = args
+    result = run_task(site, year, scenario, step_hours)
+    result['inputs_hash'] = task_inputs_hash(site, scenario, step_hours)
+    return result
+
+
+def task_key(site, year, scenario):
+    """(str, int, str) -> str
+
+    Return the checkpoint key of a task
+
+    >>> task_key('ames', 1998, 'maize_soy')
+    'ames|1998|maize_soy'
+    """
+    return '%s|%d|%s' % (site, year, scenario)
+
+
+def ensemble_tasks(sites, scenarios, years):
+    """(list, list, list) -> list
+
+    Return (site, year, scenario) rows of every task. Site rows with a year
+    column apply to that year only, e.g. for yearly transmission, and
+    override the site rows without one.
+
+    >>> tasks = ensemble_tasks(
+    ...     [{'site': 'a', 'atm_transm': 0.7},
+    ...      {'site': 'a', 'year': 2001, 'atm_transm': 0.6}],
+    ...     [{'scenario': 's'}], [2000, 2001])
+    >>> [(year, site['atm_transm']) for site, year, _ in tasks]
+    [(2000, 0.7), (2001, 0.6)]
+    """
+    site_years = {}
+    for site in sites:
+        if 'year' not in site:
+            for year in years:
+                site_years.setdefault((site['site'], year), site)
+    for site in sites:
+        if 'year' in site and int(site['year']) in years:
+            site_years[(site['site'], int(site['year']))] = site
+    site_order = []
+    for site in sites:
+        if site['site'] not in site_order:
+            site_order.append(site['site'])
+    return [(site_years[(name, year)], year, scenario)
+            for name in site_order for year in years
+            if (name, year) in site_years
+            for scenario in scenarios]
+
+
+def read_checkpoint(fname):
+    """(str) -> dict
+
+    Return {task key: result} of the tasks completed in a checkpoint file,
+    empty when there is none. A last line cut by a crash is ignored.
+    """
+    results = {}
+    if not os.path.exists(fname):
+        return results
+    with open(fname) as checkpoint:
+        for line in checkpoint:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            results[task_key(result['site'], result['year'],
+                             result['scenario'])] = result
+    return results
+
+
+def write_seasonal(fname, results):
+    """(str, list) -> None
+
+    Write seasonal interception results, one row per (site, year, scenario,
+    species), replacing fname atomically. Seasons without incident
+    radiation, in polar night, have an intercpt_fraction of 0.
+    """
+    with open(fname + '.tmp', 'w') as output:
+        writer = csv.writer(output, lineterminator='\n')
+        writer.writerow(OUTPUT_COLUMNS)
+        for result in results:
+            for species, rad_intercpt in enumerate(result['rad_intercpt']):
+                if result['incident_rad'] > 0:
+                    intercpt_fraction = rad_intercpt / result['incident_rad']
+                else:
+                    intercpt_fraction = 0.
+                writer.writerow([result['site'], result['year'],
+                                 result['scenario'], species + 1,
+                                 result['days'],
+                                 '%.6g' % result['incident_rad'],
+                                 '%.6g' % rad_intercpt,
+                                 '%.6g' % intercpt_fraction])
+    os.replace(fname + '.tmp', fname)
+
+
+def run_ensemble(sites, scenarios, years, out_file, checkpoint_file=None,
+                 step_hours=DEFAULT_STEP_HOURS, processes=None):
+    """(list, list, list, str, str, float, int) -> (int, int)
+
+    Run every (site, year, scenario) task across a process pool and write
+    the seasonal interception of each species to out_file (see
+    write_seasonal), returning (tasks run, tasks found completed). Each
+    task is appended to checkpoint_file (default out_file + '.checkpoint')
+    as soon as it is done, and tasks found there are not run again, so an
+    interrupted ensemble restarts where it stopped. Tasks whose site row,
+    scenario row or step_hours changed since (see task_inputs_hash) are
+    run again.
+
+    sites: site rows, see run_task and ensemble_tasks
+    scenarios: scenario rows, see run_task
+    years: years of every site
+
+    >>> import tempfile
+    >>> out_file = os.path.join(tempfile.mkdtemp(), 'seasonal.csv')
+    >>> sites = [{'site': 'a', 'latitude': 40., 'elevation': 300.,
+    ...           'atm_transm': 0.7}]
+    >>> scenarios = [{'scenario': 's', 'method': 'cycles', 'start_day': 100,
+    ...               'end_day': 250, 'lai_max_1': 4., 'lai_max_2': 2.,
+    ...               'extinction_coeff_1': 0.5,
+    ...               'extinction_coeff_2': 0.6}]
+    >>> run_ensemble(sites, scenarios, [2000, 2001], out_file, processes=1)
+    (2, 0)
+    >>> run_ensemble(sites, scenarios, [2000, 2001, 2002], out_file,
+    ...              processes=1)
+    (1, 2)
+    >>> len(read_table(out_file))
+    6
+    >>> sites[0]['atm_transm'] = 0.6
+    >>> run_ensemble(sites, scenarios, [2000, 2001, 2002], out_file,
+    ...              processes=1)
+    (3, 0)
+    """
+    if checkpoint_file is None:
+        checkpoint_file = out_file + '.checkpoint'
+    tasks = ensemble_tasks(sites, scenarios, years)
+    keys = [task_key(site['site'], year, scenario['scenario'])
+            for site, year, scenario in tasks]
+    completed = read_checkpoint(checkpoint_file)
+    pending = [(site, year, scenario, step_hours)
+               for (site, year, scenario), key in zip(tasks, keys)
+               if key not in completed or
+               completed[key].get('inputs_hash') !=
+               task_inputs_hash(site, scenario, step_hours)]
+    number_completed = len(keys) - len(pending)
+    with open(checkpoint_file, 'a') as checkpoint:
+        # End a last line cut by a crash, so the next task starts a line
+        if checkpoint.tell() > 0:
+            with open(checkpoint_file, 'rb') as previous:
+                previous.seek(-1, os.SEEK_END)
+                if previous.read(1) != b'\n':
+                    checkpoint.write('\n')
+        for result in imap_chunks(_run_task_chunk, pending, processes,
+                                  ordered=False):
+            checkpoint.write(json.dumps(result) + '\n')
+            checkpoint.flush()
+            completed[task_key(result['site'], result['year'],
+                               result['scenario'])] = result
+    write_seasonal(out_file, [completed[key] for key in keys])
+    return len(pending), number_completed
+
+
+def main(argv=None):
+    """Command line entry point: run an ensemble from site and scenario
+    tables
+
+    python ensemble.py SITES SCENARIOS --years FIRST LAST [-o FILE]
+                       [--checkpoint FILE] [--step-hours H] [-j PROCESSES]
+    """
+    parser = argparse.ArgumentParser(
+        description='Seasonal interception of sites, years and scenarios')
+    parser.add_argument('sites', help='site table csv: site, latitude, '
+                        'atm_press or elevation, atm_transm[, year]')
+    parser.add_argument('scenarios', help='scenario table csv, see run_task')
+    parser.add_argument('--years', type=int, nargs=2, required=True,
+                        metavar=('FIRST', 'LAST'), help='years, inclusive')
+    parser.add_argument('-o', '--output', default='seasonal.csv',
+                        help='output csv, default seasonal.csv')
+    parser.add_argument('--checkpoint', default=None,
+                        help='checkpoint file, default OUTPUT.checkpoint')
+    parser.add_argument('--step-hours', type=float,
+                        default=DEFAULT_STEP_HOURS,
+                        help='sub daily time step [h], default 1')
+    parser.add_argument('-j', '--processes', type=int, default=None,
+                        help='worker processes, default one per CPU')
+    args = parser.parse_args(argv)
+    years = list(range(args.years[0], args.years[1] + 1))
+    run, skipped = run_ensemble(read_table(args.sites),
+                                read_table(args.scenarios), years,
+                                args.output, args.checkpoint,
+                                args.step_hours, args.processes)
+    print('ran %d tasks, %d already completed, wrote %s' % (
+        run, skipped, args.output))
+
+
+if __name__ == "__main__":
+    main()
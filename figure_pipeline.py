@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+'''Headless, parallel and incremental rendering of the publication figures'''
+from __future__ import division
+import argparse
+import json
+import os
+from content_hash import content_hash, source_hash
+from light_interception_pub import FIGURES, figure_path, use_result_store
+from parallel import map_chunks
+from result_store import ResultStore
+
+# Hashes of the last render of every figure, kept in the output directory
+MANIFEST_NAME = 'figures_manifest.json'
+# matplotlib backend of the workers, no display needed
+BACKEND = 'Agg'
+
+
+def read_manifest(out_dir):
+    """(str) -> dict
+
+    Return {figure file: {'data': hash, 'code': hash}} of the last renders
+    in out_dir, empty when there is none
+    """
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as manifest:
+        return json.load(manifest)
+
+
+def write_manifest(out_dir, manifest):
+    """(str, dict) -> None
+
+    Write the manifest to out_dir, replacing the previous one atomically
+    """
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(path + '.tmp', 'w') as new_manifest:
+        json.dump(manifest, new_manifest, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def figure_hashes(number, data):
+    """(int, dict) -> dict
+
+    Return the hashes deciding whether a figure must be redrawn: its data
+    and the code of its plot function
+    """
+    _, plot_func = FIGURES[number]
+    return {'data': content_hash(data), 'code': source_hash(plot_func)}
+
+
+def _render_figure(args):
+    """Process pool entry point: draw one figure with the Agg backend"""
+    number, data, path = args
+    import matplotlib
+    matplotlib.use(BACKEND)
+    import matplotlib.pyplot as plt
+    _, plot_func = FIGURES[number]
+    fig = plot_func(data)
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def render_figures(numbers=None, out_dir='.', processes=None, force=False):
+    """(list, str, int, bool) -> (list, list)
+
+    Render figures to out_dir and return (rendered paths, skipped paths).
+    The data of every figure is computed once, in this process, and
+    hashed together with the plot function source; figures whose file
+    exists with the hashes of the manifest are skipped. The others are
+    drawn in parallel worker processes with the Agg backend, and the
+    manifest is updated.
+
+    numbers: figure numbers, default all of FIGURES
+    out_dir: output directory, created if needed
+    processes: worker processes, default one per CPU
+    force: render all figures regardless of the manifest
+    """
+    if numbers is None:
+        numbers = sorted(FIGURES)
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    manifest = read_manifest(out_dir)
+    tasks, hashes, skipped = [], {}, []
+    for number in numbers:
+        data_func, _ = FIGURES[number]
+        data = data_func()
+        path = figure_path(number, out_dir)
+        name = os.path.basename(path)
+        hashes[name] = figure_hashes(number, data)
+        if (not force and os.path.exists(path) and
+                manifest.get(name) == hashes[name]):
+            skipped.append(path)
+        else:
+            tasks.append((number, data, path))
+    rendered = map_chunks(_render_figure, tasks, processes)
+    for path in rendered:
+        name = os.path.basename(path)
+        manifest[name] = hashes[name]
+    write_manifest(out_dir, manifest)
+    return rendered, skipped
+
+
+def main(argv=None):
+    """Command line entry point: render changed publication figures
+
+    python figure_pipeline.py [-f N [N ...]] [-o DIR] [-j PROCESSES]
+                              [--store FILE] [--force]
+    """
+    parser = argparse.ArgumentParser(
+        description='Render changed light interception figures in parallel')
+    parser.add_argument('-f', '--figures', type=int, nargs='+',
+                        choices=sorted(FIGURES), default=sorted(FIGURES),
+                        help='figure numbers, default all')
+    parser.add_argument('-o', '--out-dir', default='.',
+                        help='output directory, default current')
+    parser.add_argument('-j', '--processes', type=int, default=None,
+                        help='worker processes, default one per CPU')
+    parser.add_argument('--store', default=None,
+                        help='result store database of the figure data')
+    parser.add_argument('--force', action='store_true',
+                        help='render figures even if unchanged')
+    args = parser.parse_args(argv)
+    if args.store is not None:
+        use_result_store(ResultStore(args.store))
+    rendered, skipped = render_figures(args.figures, args.out_dir,
+                                       args.processes, args.force)
+    for path in rendered:
+        print('rendered %s' % path)
+    for path in skipped:
+        print('unchanged %s' % path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+'''LRU memoization of interception calls with quantized inputs'''
+from __future__ import division
+import collections
+import copy
+import timeit
+import numpy as np
+
+# Default input quantization step and number of cached results
+DEFAULT_QUANTUM = 1e-4
+DEFAULT_MAXSIZE = 4096
+
+
+class InterceptionCache(object):
+    """Least recently used cache around a competition method taking a
+    crop_list, e.g. rad_intercpt_cycles or rad_intercpt_apsim
+
+    func: method called as func(crop_list)
+    quantum: inputs (k, LAI, height) are rounded to multiples of quantum
+     for the lookup, so nearly identical canopies share one result. None
+     caches exact inputs only.
+    maxsize: number of results kept, least recently used evicted first
+
+    Rounded inputs are only the cache key: a miss evaluates func on the
+    exact inputs, so small valid leaf area index or height values are never
+    rounded to zero. A hit returns the result of the first canopy of its
+    bin; see quantization_error to pick quantum against the accuracy
+    needed.
+
+    >>> from rad_competition_methods import rad_intercpt_cycles
+    >>> cycles = InterceptionCache(rad_intercpt_cycles, quantum=1e-3)
+    >>> cycles(([0.5, 1, 1], [0.5, 1, 2]))
+    array([0.29025726, 0.3418633 ])
+    >>> cycles(([0.5, 1.0001, 1], [0.5, 1, 2]))
+    array([0.29025726, 0.3418633 ])
+    >>> cycles.hits, cycles.misses
+    (1, 1)
+    >>> coarse = InterceptionCache(rad_intercpt_cycles, quantum=0.1)
+    >>> coarse(([0.54, 0.015, 0.015], [0.51, 0.03, 0.02]))
+    array([0.00799723, 0.01513112])
+    """
+
+    def __init__(self, func, quantum=DEFAULT_QUANTUM,
+                 maxsize=DEFAULT_MAXSIZE):
+        assert quantum is None or quantum > 0
+        assert maxsize > 0
+        self.func = func
+        self.quantum = quantum
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.miss_time = 0.  # time spent evaluating func [s]
+        self._results = collections.OrderedDict()
+
+    def quantize(self, crop_list):
+        """(list) -> array
+
+        Return crop_list as a float array rounded to the quantization step,
+        positive values to at least one step so they stay valid inputs
+
+        >>> InterceptionCache(abs, quantum=0.1).quantize([[0.54, 0.015, 0]])
+        array([[0.5, 0.1, 0. ]])
+        """
+        inputs = np.asarray(crop_list, dtype=float)
+        if self.quantum is None:
+            return inputs
+        rounded = np.round(inputs / self.quantum) * self.quantum
+        return np.where(inputs > 0, np.maximum(rounded, self.quantum),
+                        rounded)
+
+    def __call__(self, crop_list):
+        inputs = self.quantize(crop_list)
+        key = (inputs.shape, inputs.tobytes())
+        if key in self._results:
+            self.hits += 1
+            self._results.move_to_end(key)
+            return copy.copy(self._results[key])
+        self.misses += 1
+        start = timeit.default_timer()
+        result = self.func(crop_list)
+        self.miss_time += timeit.default_timer() - start
+        self._results[key] = result
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+            self.evictions += 1
+        return copy.copy(result)
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        """Drop all cached results and reset statistics"""
+        self.__init__(self.func, self.quantum, self.maxsize)
+
+    def stats(self):
+        """() -> dict
+
+        Return hits, misses, evictions, size, hit_rate, miss_time [s] and
+        saved_time [s], the hits times the mean evaluation time of a miss
+        """
+        calls = self.hits + self.misses
+        mean_miss_time = self.miss_time / self.misses if self.misses else 0.
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._results),
+                'hit_rate': self.hits / calls if calls else 0.,
+                'miss_time': self.miss_time,
+                'saved_time': self.hits * mean_miss_time}
+
+
+def quantization_error(func, crop_lists, quantum):
+    """(function, list, float) -> float
+
+    Return the maximum absolute difference between func on the exact inputs
+    and the result an InterceptionCache of the given quantum returns, for
+    every canopy of a sample of crop_lists run through the cache in order.
+    Every canopy is evaluated exactly and compared with the cached value of
+    its bin, i.e. the result of the first canopy of the sample in that bin.
+
+    >>> from rad_competition_methods import rad_intercpt_apsim
+    >>> round(quantization_error(rad_intercpt_apsim,
+    ...                          [([0.5, 1], [0.7, 3]),
+    ...                           ([0.5, 1.04], [0.7, 3])], 0.1), 6)
+    0.006
+    """
+    crop_lists = list(crop_lists)
+    cache = InterceptionCache(func, quantum=quantum,
+                              maxsize=max(len(crop_lists), 1))
+    return max(float(np.abs(np.asarray(func(crop_list)) -
+                            np.asarray(cache(crop_list))).max())
+               for crop_list in crop_lists)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+'''Monte Carlo propagation of input uncertainty through the competition
+methods'''
+from __future__ import division
+import numpy as np
+from rad_competition_methods import (BATCH_METHODS, SkyGrid,
+                                     rad_intercpt_sub_daily_species)
+from parallel import imap_chunks, row_chunks
+
+# Samples drawn and evaluated per chunk
+DEFAULT_CHUNK_SIZE = 10000
+# Histogram bins of interception on [0, 1], percentile resolution 1 / bins
+DEFAULT_BINS = 10000
+# Sky of 'sub_daily' runs when not given: zenith angles [deg], pressure
+# [kPa], atmospheric and leaf transmission
+SUB_DAILY_ANGLES = np.linspace(0, 90, 19)
+SUB_DAILY_ATM_PRESS = 101.3
+SUB_DAILY_ATM_TRANSM = 0.75
+SUB_DAILY_LEAF_TRANSM = 0.8
+
+
+def _sample_constant(rng, size, value):
+    value = np.asarray(value, dtype=float)
+    return np.broadcast_to(value, (size,) + value.shape).copy()
+
+
+def _sample_uniform(rng, size, low, high):
+    return rng.uniform(low, high, (size,) + np.broadcast(low, high).shape)
+
+
+def _sample_normal(rng, size, mean, std):
+    if (np.asarray(mean) <= 0).any():
+        raise ValueError("normal mean must be positive, got %r" % (mean,))
+    shape = (size,) + np.broadcast(mean, std).shape
+    samples = rng.normal(mean, std, shape)
+    # Truncated at zero: non positive draws are drawn again
+    mean, std = np.broadcast_to(mean, shape), np.broadcast_to(std, shape)
+    redraw = samples <= 0
+    while redraw.any():
+        samples[redraw] = rng.normal(mean[redraw], std[redraw])
+        redraw = samples <= 0
+    return samples
+
+
+def _sample_lognormal(rng, size, mean, sigma):
+    return rng.lognormal(mean, sigma,
+                         (size,) + np.broadcast(mean, sigma).shape)
+
+
+def _sample_triangular(rng, size, left, mode, right):
+    return rng.triangular(left, mode, right,
+                          (size,) + np.broadcast(left, mode, right).shape)
+
+
+# Distributions as (name, parameters...) tuples; lognormal takes the mean
+# and standard deviation of the log, normal is truncated at zero
+DISTRIBUTIONS = {'constant': _sample_constant,
+                 'uniform': _sample_uniform,
+                 'normal': _sample_normal,
+                 'lognormal': _sample_lognormal,
+                 'triangular': _sample_triangular}
+# Parameters the batched methods require to be strictly positive
+POSITIVE_PARAMETERS = ('extinction_coeff', 'leaf_area_index', 'height')
+
+
+def draw_samples(rng, distributions, size):
+    """(Generator, dict, int) -> dict
+
+    Return {parameter: samples} drawing size samples of every parameter
+
+    rng: numpy random Generator
+    distributions: {parameter: (distribution, parameters...)}, see
+     DISTRIBUTIONS. Per species parameters (extinction_coeff,
+     leaf_area_index, height, x_area_ratio) take one value per species and
+     give [size, n_species] samples; canopy parameters (atm_transm,
+     leaf_transm) take scalars and give [size] samples.
+
+    >>> samples = draw_samples(np.random.default_rng(0),
+    ...                        {'extinction_coeff': ('constant', [0.5, 0.6]),
+    ...                         'leaf_area_index': ('uniform', 1, [2, 3])}, 4)
+    >>> samples['extinction_coeff'].shape, samples['leaf_area_index'].shape
+    ((4, 2), (4, 2))
+    >>> heights = draw_samples(np.random.default_rng(0),
+    ...                        {'height': ('normal', 0.1, 1.)}, 1000)['height']
+    >>> bool((heights > 0).all())
+    True
+    >>> draw_samples(np.random.default_rng(0),
+    ...              {'height': ('uniform', -1, 1)}, 4)
+    Traceback (most recent call last):
+    ...
+    ValueError: height samples must be positive
+    """
+    samples = dict((name, DISTRIBUTIONS[spec[0]](rng, size, *spec[1:]))
+                   for name, spec in distributions.items())
+    for name in POSITIVE_PARAMETERS:
+        if name in samples and (samples[name] <= 0).any():
+            raise ValueError("%s samples must be positive" % name)
+    return samples
+
+
+def evaluate_method(method, samples, sky_angles=SUB_DAILY_ANGLES,
+                    atm_press=SUB_DAILY_ATM_PRESS):
+    """(str, dict, array, float) -> array
+
+    Return rad intercepted on each species [n_samples, n_species] of a
+    batch of sampled canopies in one vectorized call
+
+    method: 'cycles', 'wallace', 'apsim' (see BATCH_METHODS) or 'sub_daily'
+    samples: {parameter: array} as from draw_samples. 'sub_daily' reads
+     leaf_area_index and x_area_ratio, and atm_transm and leaf_transm when
+     given; the other methods read extinction_coeff, leaf_area_index and
+     height.
+    sky_angles: solar zenith angles [deg] of 'sub_daily' runs
+    atm_press: atmospheric pressure [kPa] of 'sub_daily' runs
+
+    >>> evaluate_method('apsim', {'extinction_coeff': np.array([[0.5, 0.7]]),
+    ...                           'leaf_area_index': np.array([[1., 3.]])})
+    array([[0.17802431, 0.74770211]])
+    """
+    if method == 'sub_daily':
+        atm_transm = np.asarray(samples.get('atm_transm',
+                                            SUB_DAILY_ATM_TRANSM))
+        sky = SkyGrid(sky_angles, atm_press, atm_transm[..., None])
+        return rad_intercpt_sub_daily_species(
+            samples.get('leaf_transm', SUB_DAILY_LEAF_TRANSM),
+            samples['leaf_area_index'], samples['x_area_ratio'], sky)
+    return BATCH_METHODS[method](samples['extinction_coeff'],
+                                 samples['leaf_area_index'],
+                                 samples.get('height'))
+
+
+class InterceptionHistogram(object):
+    """Streaming summary of interception samples of each species: counts on
+    fixed bins over [0, 1], plus sums for the exact mean and standard
+    deviation. Memory does not grow with the number of samples, and
+    histograms of separate chunks merge by addition.
+
+    number_species: number of species
+    bins: number of bins on [0, 1], percentiles are resolved to 1 / bins
+
+    >>> histogram = InterceptionHistogram(1, bins=100)
+    >>> histogram.update(np.linspace(0.0005, 0.9995, 1000)[:, None])
+    >>> histogram.percentile(5), histogram.mean()
+    (array([0.05]), array([0.5]))
+    """
+
+    def __init__(self, number_species, bins=DEFAULT_BINS):
+        self.bins = bins
+        self.counts = np.zeros((number_species, bins), dtype=np.int64)
+        self.total = np.zeros(number_species)
+        self.total_sq = np.zeros(number_species)
+        self.count = 0
+
+    def update(self, rad_intercpt):
+        """(array) -> None
+
+        Add samples of rad intercepted [n_samples, n_species]
+        """
+        rad_intercpt = np.asarray(rad_intercpt, dtype=float)
+        index = np.clip((rad_intercpt * self.bins).astype(np.int64), 0,
+                        self.bins - 1)
+        for species, species_index in enumerate(index.T):
+            self.counts[species] += np.bincount(species_index,
+                                                minlength=self.bins)
+        self.total += rad_intercpt.sum(axis=0)
+        self.total_sq += (rad_intercpt ** 2).sum(axis=0)
+        self.count += len(rad_intercpt)
+
+    def merge(self, other):
+        """(InterceptionHistogram) -> None
+
+        Add the samples of another histogram with the same bins
+        """
+        assert other.bins == self.bins
+        self.counts += other.counts
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.count += other.count
+
+    def mean(self):
+        return self.total / self.count
+
+    def std(self):
+        return np.sqrt(np.maximum(self.total_sq / self.count -
+                                  self.mean() ** 2, 0))
+
+    def percentile(self, q):
+        """(float) -> array
+
+        Return the q-th percentile of each species, linearly interpolated
+        inside the bin holding it
+        """
+        assert 0 <= q <= 100
+        cumulative = np.cumsum(self.counts, axis=1)
+        target = q / 100 * self.count
+        result = np.zeros(len(self.counts))
+        for species in range(len(self.counts)):
+            i = min(np.searchsorted(cumulative[species], target),
+                    self.bins - 1)
+            below = cumulative[species, i - 1] if i > 0 else 0
+            in_bin = self.counts[species, i]
+            fraction = (target - below) / in_bin if in_bin else 0.
+            result[species] = (i + fraction) / self.bins
+        return result
+
+
+def _monte_carlo_chunk(args):
+    """Process pool entry point: draw, evaluate and bin one chunk"""
+    seed_sequence, size, distributions, method, number_species, bins = args
+    samples = draw_samples(np.random.default_rng(seed_sequence),
+                           distributions, size)
+    histogram = InterceptionHistogram(number_species, bins)
+    histogram.update(evaluate_method(method, samples))
+    return histogram
+
+
+def monte_carlo(distributions, number_species, method='cycles',
+                number_samples=100000, chunk_size=DEFAULT_CHUNK_SIZE,
+                seed=0, percentiles=(5, 50, 95), bins=DEFAULT_BINS,
+                processes=None):
+    """(dict, int, str, int, int, int, tuple, int, int) -> dict
+
+    Return mean, std and {q: percentile} of rad intercepted by each species
+    propagating the input distributions through a competition method
+
+    distributions: {parameter: (distribution, parameters...)}, see
+     draw_samples and evaluate_method for the parameters each method needs
+    number_species: number of species
+    method: 'cycles', 'wallace', 'apsim' or 'sub_daily'
+    number_samples: number of Monte Carlo samples
+    chunk_size: samples drawn and evaluated per batched call
+    seed: seed of the run
+    percentiles: percentiles returned
+    bins: histogram bins over [0, 1], percentile resolution
+    processes: worker processes, default one per CPU
+
+    Every chunk draws from its own stream spawned from SeedSequence(seed),
+    so results are reproducible and do not depend on processes. Chunks are
+    reduced to histograms in the workers and merged as they arrive; no
+    sample is kept.
+
+    >>> summary = monte_carlo(
+    ...     {'extinction_coeff': ('uniform', [0.45, 0.45], [0.65, 0.65]),
+    ...      'leaf_area_index': ('lognormal', np.log([1.5, 2]), 0.2),
+    ...      'height': ('normal', [0.6, 0.8], 0.05)}, 2,
+    ...     number_samples=20000, processes=1)
+    >>> summary['percentiles'][50].round(3)
+    array([0.338, 0.51 ])
+    """
+    chunks = row_chunks(number_samples, chunk_size)
+    streams = np.random.SeedSequence(seed).spawn(len(chunks))
+    tasks = ((stream, stop - start, distributions, method, number_species,
+              bins) for stream, (start, stop) in zip(streams, chunks))
+    histogram = InterceptionHistogram(number_species, bins)
+    for chunk_histogram in imap_chunks(_monte_carlo_chunk, tasks, processes):
+        histogram.merge(chunk_histogram)
+    return {'mean': histogram.mean(),
+            'std': histogram.std(),
+            'percentiles': dict((q, histogram.percentile(q))
+                                for q in percentiles),
+            'histogram': histogram}
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
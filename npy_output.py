@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+'''Chunked output of large runs to memory mapped .npy files, written as
+each chunk finishes and read back lazily'''
+from __future__ import division
+import os
+import numpy as np
+from rad_competition_methods import BATCH_METHODS
+from parallel import imap_chunks, row_chunks
+
+# Rows per batched call of batch_to_npy, and per chunk read by iter_npy
+DEFAULT_CHUNK_SIZE = 100000
+
+
+def write_npy_chunks(fname, dtype, shape, results):
+    """(str, dtype, tuple, iterable) -> memmap
+
+    Write (start, stop, rows) chunks of results into a .npy file of the
+    given dtype and shape, rows on the first axis, as they arrive,
+    flushing each to disk, and return the file memory mapped read only.
+    Only one chunk is held in memory at a time. The file is written under a
+    temporary name and renamed once complete, so an interrupted run leaves
+    no partial fname.
+
+    >>> import tempfile
+    >>> fname = os.path.join(tempfile.mkdtemp(), 'squares.npy')
+    >>> write_npy_chunks(fname, float, (5,),
+    ...                  ((start, stop, np.arange(start, stop) ** 2.)
+    ...                   for start, stop in row_chunks(5, 2)))
+    memmap([ 0.,  1.,  4.,  9., 16.])
+    """
+    partial = fname + '.part'
+    output = np.lib.format.open_memmap(partial, mode='w+', dtype=dtype,
+                                       shape=shape)
+    written = 0
+    for start, stop, rows in results:
+        output[start:stop] = rows
+        output.flush()
+        written += stop - start
+    assert written == shape[0], "Chunks do not cover every row"
+    del output
+    os.replace(partial, fname)
+    return read_npy(fname)
+
+
+def read_npy(fname):
+    """(str) -> memmap
+
+    Return a .npy file memory mapped read only: slices and fields are only
+    read from disk when used
+    """
+    return np.load(fname, mmap_mode='r')
+
+
+def iter_npy(fname, chunk_size=DEFAULT_CHUNK_SIZE, start=0, stop=None):
+    """(str, int, int, int) -> generator
+
+    Yield (start, rows) of consecutive chunks of rows start to stop of a
+    .npy file, each read into memory on its own
+    """
+    table = read_npy(fname)
+    if stop is None:
+        stop = len(table)
+    for chunk_start, chunk_stop in row_chunks(stop - start, chunk_size):
+        yield (start + chunk_start,
+               np.array(table[start + chunk_start:start + chunk_stop]))
+
+
+def batch_chunk(args):
+    """(tuple) -> array
+
+    Return the rad intercepted on each species of one chunk of canopies,
+    args being (method, extinction_coeff, leaf_area_index, height), see
+    BATCH_METHODS. Process pool entry point of batch_to_npy.
+
+    >>> batch_chunk(('apsim', np.array([[0.5, 0.7]]), np.array([[1., 3.]]),
+    ...              None))
+    array([[0.17802431, 0.74770211]])
+    """
+    method, extinction_coeff, leaf_area_index, height = args
+    return BATCH_METHODS[method](extinction_coeff, leaf_area_index, height)
+
+
+def batch_to_npy(fname, method, extinction_coeff, leaf_area_index, height,
+                 chunk_size=DEFAULT_CHUNK_SIZE, processes=None):
+    """(str, str, array, array, array, int, int) -> memmap
+
+    Write the rad intercepted on each species [n_canopies, n_species] of a
+    batched method to a .npy file chunk by chunk, and return it memory
+    mapped read only. Inputs [n_canopies, n_species] may themselves be
+    memory mapped (see read_npy); only the rows of the chunks in flight are
+    read.
+
+    method: 'cycles', 'wallace' or 'apsim', see BATCH_METHODS
+
+    >>> import tempfile
+    >>> fname = os.path.join(tempfile.mkdtemp(), 'apsim.npy')
+    >>> batch_to_npy(fname, 'apsim', np.array([[0.5, 0.7]] * 3),
+    ...              np.array([[1., 3.]] * 3), None, chunk_size=2,
+    ...              processes=1)[2]
+    memmap([0.17802431, 0.74770211])
+    """
+    number_rows = len(leaf_area_index)
+    bounds = row_chunks(number_rows, chunk_size)
+    chunks = ((method, extinction_coeff[start:stop],
+               leaf_area_index[start:stop],
+               None if height is None else height[start:stop])
+              for start, stop in bounds)
+    results = imap_chunks(batch_chunk, chunks, processes)
+    return write_npy_chunks(
+        fname, float, leaf_area_index.shape,
+        ((start, stop, rows)
+         for (start, stop), rows in zip(bounds, results)))
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+'''Process pool helpers for batched interception runs'''
+from __future__ import division
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+import numpy as np
+
+# Bytes of input and output rows per shared memory chunk, about the size of
+# a per core L2 cache
+CHUNK_CACHE_BYTES = 1 << 20
+# Shared memory blocks of the current worker: func, inputs, output
+_WORKER_SHARED = None
+
+
+def row_chunks(number_rows, chunk_size):
+    """(int, int) -> list
+
+    Return (start, stop) row ranges of at most chunk_size rows covering
+    number_rows rows
+
+    >>> row_chunks(10, 4)
+    [(0, 4), (4, 8), (8, 10)]
+    """
+    assert chunk_size > 0
+    return [(start, min(start + chunk_size, number_rows))
+            for start in range(0, number_rows, chunk_size)]
+
+
+def default_processes():
+    """() -> int
+
+    Return the number of worker processes used when none is given
+    """
+    return os.cpu_count() or 1
+
+
+def map_chunks(func, chunks, processes=None):
+    """(function, list, int) -> list
+
+    Return [func(chunk) for chunk in chunks], computed across a process
+    pool. func must be a module level function so it can be sent to the
+    workers. With one process, or a single chunk, chunks are run in this
+    process and no pool is started.
+
+    func: function of one chunk
+    chunks: list of picklable arguments
+    processes: number of worker processes, default one per CPU
+
+    >>> map_chunks(abs, [-1, 2, -3], processes=2)
+    [1, 2, 3]
+    """
+    chunks = list(chunks)
+    if processes is None:
+        processes = default_processes()
+    processes = min(processes, len(chunks))
+    if processes <= 1:
+        return [func(chunk) for chunk in chunks]
+    pool = multiprocessing.Pool(processes)
+    try:
+        return pool.map(func, chunks)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def imap_chunks(func, chunks, processes=None, ordered=True):
+    """(function, iterable, int, bool) -> generator
+
+    Yield func(chunk) for chunks in order, computed across a process pool,
+    so results can be reduced as they arrive instead of being held all at
+    once. With ordered False results are yielded as soon as they are done,
+    in any order. If the consumer stops early (closes the generator or
+    raises) the pool is terminated, dropping the tasks not yet done. See
+    map_chunks.
+
+    >>> list(imap_chunks(abs, [-1, 2, -3], processes=2))
+    [1, 2, 3]
+    """
+    if processes is None:
+        processes = default_processes()
+    if processes <= 1:
+        for chunk in chunks:
+            yield func(chunk)
+        return
+    pool = multiprocessing.Pool(processes)
+    try:
+        imap = pool.imap if ordered else pool.imap_unordered
+        for result in imap(func, chunks):
+            yield result
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+
+
+def cache_chunk_size(arrays, cache_bytes=CHUNK_CACHE_BYTES):
+    """(list, int) -> int
+
+    Return the number of rows of arrays (row axis first) whose data fits
+    in cache_bytes, at least one
+
+    >>> cache_chunk_size([np.zeros((10, 2)), np.zeros((10, 2))], 1024)
+    32
+    """
+    row_bytes = sum(array[:1].nbytes for array in arrays)
+    return max(1, cache_bytes // max(row_bytes, 1))
+
+
+def _share(array):
+    """Copy array into a new shared memory block, return (block, spec)"""
+    block = shared_memory.SharedMemory(create=True,
+                                       size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, array.dtype, buffer=block.buf)
+    shared[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach(spec):
+    """Return (block, array) of a shared memory spec of _share"""
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype, buffer=block.buf)
+
+
+def _attach_worker(func, input_specs, output_spec):
+    """Process pool initializer: attach the shared blocks once per worker"""
+    global _WORKER_SHARED
+    blocks, inputs = [], []
+    for spec in input_specs:
+        if spec is None:
+            inputs.append(None)
+        else:
+            block, array = _attach(spec)
+            blocks.append(block)
+            inputs.append(array)
+    output_block, output = _attach(output_spec)
+    _WORKER_SHARED = (func, inputs, output, blocks + [output_block])
+
+
+def _shared_chunk(bounds):
+    """Process pool entry point: compute rows start to stop in place"""
+    start, stop = bounds
+    func, inputs, output, _ = _WORKER_SHARED
+    output[start:stop] = func(*[None if array is None else array[start:stop]
+                                for array in inputs])
+    return stop - start
+
+
+def shared_map_rows(func, inputs, output_shape=None, output_dtype=float,
+                    chunk_size=None, processes=None):
+    """(function, list, tuple, dtype, int, int) -> array
+
+    Return func applied to row chunks of inputs, e.g. a BATCH_METHODS
+    kernel on [n_canopies, n_species] arrays, computed across a process
+    pool without pickling any array. Inputs and output are copied to
+    multiprocessing.shared_memory blocks that every worker attaches once;
+    tasks are only (start, stop) rows, and each worker writes its rows of
+    the output in place.
+
+    func: module level function of input row slices returning output rows
+    inputs: arrays with rows on the first axis, or None for inputs passed
+     as None (e.g. the height of the apsim method)
+    output_shape: shape of the output, default that of the first input
+    chunk_size: rows per task, default the rows fitting CHUNK_CACHE_BYTES
+     so each task works in cache
+    processes: number of worker processes, default one per CPU
+
+    >>> shared_map_rows(np.add, [np.arange(6.), np.ones(6)], chunk_size=2,
+    ...                 processes=2)
+    array([1., 2., 3., 4., 5., 6.])
+    """
+    inputs = [None if array is None else np.ascontiguousarray(array)
+              for array in inputs]
+    arrays = [array for array in inputs if array is not None]
+    assert len(set(len(array) for array in arrays)) == 1, \
+        "Inputs must have the same number of rows"
+    if output_shape is None:
+        output_shape = arrays[0].shape
+    assert output_shape[0] == len(arrays[0]), \
+        "Output must have the rows of the inputs"
+    if processes is None:
+        processes = default_processes()
+    if chunk_size is None:
+        chunk_size = cache_chunk_size(
+            arrays + [np.empty((1,) + tuple(output_shape[1:]),
+                               output_dtype)])
+    bounds = row_chunks(output_shape[0], chunk_size)
+    if processes <= 1 or len(bounds) <= 1:
+        output = np.empty(output_shape, output_dtype)
+        for start, stop in bounds:
+            output[start:stop] = func(*[None if array is None
+                                        else array[start:stop]
+                                        for array in inputs])
+        return output
+    blocks, input_specs = [], []
+    pool = None
+    try:
+        for array in inputs:
+            if array is None:
+                input_specs.append(None)
+            else:
+                block, spec = _share(array)
+                blocks.append(block)
+                input_specs.append(spec)
+        output_block, output_spec = _share(np.empty(output_shape,
+                                                    output_dtype))
+        blocks.append(output_block)
+        pool = multiprocessing.Pool(min(processes, len(bounds)),
+                                    _attach_worker,
+                                    (func, input_specs, output_spec))
+        pool.map(_shared_chunk, bounds)
+        return np.ndarray(output_shape, output_dtype,
+                          buffer=output_block.buf).copy()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
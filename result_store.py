@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+'''Persistent store of computed results, shared across runs and users, so
+that repeated evaluations are read instead of recomputed'''
+from __future__ import division
+import argparse
+import io
+import sqlite3
+import time
+import numpy as np
+from content_hash import content_hash, source_hash
+from parallel import imap_chunks, map_chunks
+
+# Total size of stored results above which the least recently used are
+# evicted [bytes]
+DEFAULT_MAX_BYTES = 1 << 30
+# Seconds a connection waits for another process holding the database lock
+LOCK_TIMEOUT = 60.
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS results (
+    method TEXT NOT NULL,
+    code_version TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (method, code_version, input_hash));
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL);
+'''
+
+
+def _to_blob(result):
+    """Serialize an array with np.save, without pickles"""
+    buffer = io.BytesIO()
+    np.save(buffer, np.asarray(result), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def _from_blob(blob):
+    return np.load(io.BytesIO(blob), allow_pickle=False)
+
+
+class ResultStore(object):
+    """SQLite store of result arrays keyed by method name, code version
+    (e.g. content_hash.source_hash of the code) and a canonical hash of the
+    inputs (content_hash.content_hash). When the stored results exceed
+    max_bytes the least recently read or written are evicted. Hit, miss
+    and eviction counts are kept in the database, over all its users.
+
+    path: database file, ':memory:' for a store of this process only
+    max_bytes: size limit of the stored results [bytes]
+
+    >>> store = ResultStore(':memory:', max_bytes=1000)
+    >>> store.get('apsim', 'v1', 'abc') is None
+    True
+    >>> store.put('apsim', 'v1', 'abc', np.array([0.2, 0.3]))
+    >>> store.get('apsim', 'v1', 'abc')
+    array([0.2, 0.3])
+    >>> store.get('apsim', 'v2', 'abc') is None
+    True
+    >>> stats = store.stats()
+    >>> stats['entries'], stats['hits'], stats['misses']
+    (1, 1, 2)
+    >>> store.put('apsim', 'v1', 'big', np.zeros(100))
+    >>> store.get('apsim', 'v1', 'abc') is None, store.stats()['evictions']
+    (True, 1)
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.connection = sqlite3.connect(path, timeout=LOCK_TIMEOUT)
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def count(self, name, increment=1):
+        """(str, int) -> None
+
+        Add increment to the statistics counter name, e.g. 'misses'
+        """
+        with self.connection:
+            self.connection.execute(
+                'INSERT INTO counters (name, value) VALUES (?, ?) '
+                'ON CONFLICT (name) DO UPDATE SET value = value + ?',
+                (name, increment, increment))
+
+    def contains(self, method, code_version, input_hash):
+        """(str, str, str) -> bool
+
+        Return whether a result is stored, without counting a hit or miss
+        """
+        return self.connection.execute(
+            'SELECT 1 FROM results WHERE method = ? AND code_version = ? '
+            'AND input_hash = ?',
+            (method, code_version, input_hash)).fetchone() is not None
+
+    def get(self, method, code_version, input_hash):
+        """(str, str, str) -> array
+
+        Return the stored result, None on a miss
+        """
+        key = (method, code_version, input_hash)
+        with self.connection:
+            row = self.connection.execute(
+                'SELECT value FROM results WHERE method = ? AND '
+                'code_version = ? AND input_hash = ?', key).fetchone()
+            if row is None:
+                self.count('misses', 1)
+                return None
+            self.connection.execute(
+                'UPDATE results SET accessed = ?, hits = hits + 1 WHERE '
+                'method = ? AND code_version = ? AND input_hash = ?',
+                (time.time(),) + key)
+            self.count('hits', 1)
+        return _from_blob(row[0])
+
+    def put(self, method, code_version, input_hash, result):
+        """(str, str, str, array) -> None
+
+        Store a result, then evict least recently used results beyond
+        max_bytes
+        """
+        blob = _to_blob(result)
+        now = time.time()
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO results (method, code_version, '
+                'input_hash, value, size, created, accessed) VALUES '
+                '(?, ?, ?, ?, ?, ?, ?)',
+                (method, code_version, input_hash, sqlite3.Binary(blob),
+                 len(blob), now, now))
+        self.evict()
+
+    def evict(self, max_bytes=None):
+        """(int) -> int
+
+        Delete the least recently used results until the store holds at
+        most max_bytes, default self.max_bytes, and return their number
+        """
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        with self.connection:
+            total = self.connection.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+            if total <= max_bytes:
+                return 0
+            evicted = []
+            for rowid, size in self.connection.execute(
+                    'SELECT rowid, size FROM results ORDER BY accessed, '
+                    'rowid'):
+                if total <= max_bytes:
+                    break
+                evicted.append((rowid,))
+                total -= size
+            self.connection.executemany(
+                'DELETE FROM results WHERE rowid = ?', evicted)
+            self.count('evictions', len(evicted))
+        return len(evicted)
+
+    def stats(self):
+        """() -> dict
+
+        Return entries, bytes, max_bytes, hits, misses, hit_rate and
+        evictions of the store, and entries per method
+        """
+        counters = dict(self.connection.execute(
+            'SELECT name, value FROM counters'))
+        entries, size = self.connection.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results'
+        ).fetchone()
+        hits = counters.get('hits', 0)
+        misses = counters.get('misses', 0)
+        return {'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': hits / (hits + misses) if hits + misses else 0.,
+                'evictions': counters.get('evictions', 0),
+                'methods': dict(self.connection.execute(
+                    'SELECT method, COUNT(*) FROM results GROUP BY method'))}
+
+
+def format_stats(stats):
+    """(dict) -> str
+
+    Return a cache statistics report of ResultStore.stats
+
+    >>> print(format_stats({'entries': 2, 'bytes': 2048,
+    ...                     'max_bytes': 1 << 20, 'hits': 3, 'misses': 1,
+    ...                     'hit_rate': 0.75, 'evictions': 0,
+    ...                     'methods': {'scenario_sweep._sweep_chunk': 2}}))
+    entries: 2 (2.0 kB of 1048.6 kB)
+    hits: 3, misses: 1, hit rate: 75.0%
+    evictions: 0
+      scenario_sweep._sweep_chunk: 2
+    """
+    lines = ['entries: %d (%.1f kB of %.1f kB)' % (
+                 stats['entries'], stats['bytes'] / 1000,
+                 stats['max_bytes'] / 1000),
+             'hits: %d, misses: %d, hit rate: %.1f%%' % (
+                 stats['hits'], stats['misses'], 100 * stats['hit_rate']),
+             'evictions: %d' % stats['evictions']]
+    for method in sorted(stats['methods']):
+        lines.append('  %s: %d' % (method, stats['methods'][method]))
+    return '\n'.join(lines)
+
+
+def cached_imap(store, func, chunks, processes=None, code=()):
+    """(ResultStore, function, list, int, tuple) -> generator
+
+    Yield func(chunk) for chunks in order like parallel.imap_chunks,
+    reading the chunks found in store and computing, then storing, only the
+    others. Results must be arrays and chunks hashable by content_hash.
+
+    store: ResultStore, None to compute every chunk
+    code: functions or modules func depends on, part of the code version
+     with func itself
+
+    Chunks evicted between the lookup and the read are computed again.
+
+    >>> def square(chunk):
+    ...     return np.asarray(chunk) ** 2
+    >>> store = ResultStore(':memory:', max_bytes=150)
+    >>> _ = list(cached_imap(store, square, [[2.]], processes=1))
+    >>> list(cached_imap(store, square, [[1.], [2.]], processes=1))
+    [array([1.]), array([4.])]
+    """
+    if store is None:
+        for result in imap_chunks(func, chunks, processes):
+            yield result
+        return
+    method = '%s.%s' % (func.__module__, func.__name__)
+    code_version = source_hash(func, *code)
+    input_hashes = [content_hash(chunk) for chunk in chunks]
+    missing = [not store.contains(method, code_version, input_hash)
+               for input_hash in input_hashes]
+    computed = imap_chunks(func, [chunk for chunk, is_missing
+                                  in zip(chunks, missing) if is_missing],
+                           processes)
+    for chunk, input_hash, is_missing in zip(chunks, input_hashes, missing):
+        if is_missing:
+            store.count('misses')
+            result = next(computed)
+            store.put(method, code_version, input_hash, result)
+        else:
+            result = store.get(method, code_version, input_hash)
+            if result is None:
+                # Evicted since the lookup, by this run or another user
+                result = func(chunk)
+                store.put(method, code_version, input_hash, result)
+        yield result
+
+
+def cached_map(store, func, chunks, processes=None, code=()):
+    """(ResultStore, function, list, int, tuple) -> list
+
+    Return [func(chunk) for chunk in chunks] like parallel.map_chunks, see
+    cached_imap
+
+    >>> def square(chunk):
+    ...     return np.asarray(chunk) ** 2
+    >>> store = ResultStore(':memory:')
+    >>> cached_map(store, square, [[1, 2], [3]], processes=1)
+    [array([1, 4]), array([9])]
+    >>> cached_map(store, square, [[3], [4]], processes=1)
+    [array([9]), array([16])]
+    >>> store.stats()['hits'], store.stats()['misses']
+    (1, 3)
+    """
+    if store is None:
+        return map_chunks(func, chunks, processes)
+    return list(cached_imap(store, func, chunks, processes, code))
+
+
+def main(argv=None):
+    """Command line entry point: report, and optionally shrink, a store
+
+    python result_store.py STORE [--max-bytes N]
+    """
+    parser = argparse.ArgumentParser(
+        description='Report the statistics of a result store')
+    parser.add_argument('path', help='store database file')
+    parser.add_argument('--max-bytes', type=int, default=None,
+                        help='evict least recently used results beyond N '
+                             'bytes')
+    args = parser.parse_args(argv)
+    with ResultStore(args.path) as store:
+        if args.max_bytes is not None:
+            store.max_bytes = args.max_bytes
+            print('evicted: %d' % store.evict())
+        print(format_stats(store.stats()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+'''Scenario sweeps: every combination of a parameter grid evaluated once
+with the batched competition methods'''
+from __future__ import division
+import numpy as np
+import rad_competition_methods
+from rad_competition_methods import BATCH_METHODS
+from npy_output import iter_npy, write_npy_chunks
+from parallel import row_chunks
+from result_store import cached_imap, cached_map
+
+# Grid axes in sweep order; lai_share, extinction_coeff and height values
+# hold one entry per species
+SWEEP_AXES = ('method', 'lai_share', 'extinction_coeff', 'height',
+              'total_lai')
+SPECIES_AXES = ('lai_share', 'extinction_coeff', 'height')
+# Method names, indexed by the method codes stored in sweep tables
+SWEEP_METHODS = tuple(sorted(BATCH_METHODS))
+# Combinations evaluated per batched call
+DEFAULT_CHUNK_SIZE = 100000
+
+
+def sweep_dtype(number_species):
+    """(int) -> dtype
+
+    Return the structured dtype of sweep tables: the grid axes, the leaf
+    area index of each species (lai_share * total_lai) and the rad
+    intercepted by each species. The method is stored as its one byte
+    index in SWEEP_METHODS, see method_names.
+    """
+    species = (float, (number_species,))
+    return np.dtype([('method', 'u1'),
+                     ('lai_share',) + species,
+                     ('extinction_coeff',) + species,
+                     ('height',) + species,
+                     ('total_lai', float),
+                     ('leaf_area_index',) + species,
+                     ('rad_intercpt',) + species])
+
+
+def sweep_grid(grid):
+    """(dict) -> list
+
+    Return [(axis, values)] of a sweep grid in SWEEP_AXES order, with
+    height defaulting to one for every species
+
+    grid: {axis: list of values}; method values are BATCH_METHODS names,
+     species axis values are sequences with one entry per species
+
+    >>> sweep_grid({'method': ['apsim'], 'lai_share': [(0.5, 0.5)],
+    ...             'extinction_coeff': [(0.4, 0.6)], 'total_lai': [1, 2]})
+    ... # doctest: +NORMALIZE_WHITESPACE
+    [('method', ['apsim']), ('lai_share', [(0.5, 0.5)]),
+     ('extinction_coeff', [(0.4, 0.6)]), ('height', [(1.0, 1.0)]),
+     ('total_lai', [1, 2])]
+    """
+    unknown = set(grid) - set(SWEEP_AXES)
+    assert not unknown, "Unknown sweep axes: %s" % sorted(unknown)
+    number_species = len(grid['lai_share'][0])
+    grid = dict(grid)
+    grid.setdefault('height', [(1.,) * number_species])
+    for name in SPECIES_AXES:
+        assert all(len(value) == number_species for value in grid[name]), \
+            "%s values need one entry per species" % name
+    return [(name, list(grid[name])) for name in SWEEP_AXES]
+
+
+def _sweep_chunk(args):
+    """Process pool entry point: evaluate combinations start to stop"""
+    axes, start, stop = args
+    shape = tuple(len(values) for _, values in axes)
+    number_species = len(dict(axes)['lai_share'][0])
+    table = np.zeros(stop - start, dtype=sweep_dtype(number_species))
+    index = np.unravel_index(np.arange(start, stop), shape)
+    for (name, values), axis_index in zip(axes, index):
+        if name == 'method':
+            values = [SWEEP_METHODS.index(method) for method in values]
+        table[name] = np.asarray(values)[axis_index]
+    table['leaf_area_index'] = (table['lai_share'] *
+                                table['total_lai'][:, None])
+    # Each method is one batched call over its rows of the chunk
+    for method in np.unique(table['method']):
+        rows = table['method'] == method
+        table['rad_intercpt'][rows] = BATCH_METHODS[SWEEP_METHODS[method]](
+            table['extinction_coeff'][rows], table['leaf_area_index'][rows],
+            table['height'][rows])
+    return table
+
+
+def sweep(grid, chunk_size=DEFAULT_CHUNK_SIZE, processes=None, store=None,
+          out_file=None):
+    """(dict, int, int, ResultStore, str) -> array
+
+    Return a structured table (see sweep_dtype) with one row per
+    combination of the grid axes, each evaluated once. Combinations are
+    enumerated by flat index in SWEEP_AXES order, split in chunks of
+    chunk_size and evaluated across a process pool.
+
+    grid: {axis: list of values}, see sweep_grid
+    chunk_size: combinations per batched call
+    processes: worker processes, default one per CPU
+    store: result_store.ResultStore; chunks found in it are read instead of
+     computed, the others are added to it
+    out_file: .npy file the table is written to chunk by chunk, for sweeps
+     larger than memory; the table is then returned memory mapped read
+     only, see npy_output.read_npy and select_npy
+
+    >>> table = sweep({'method': ['wallace', 'apsim'],
+    ...                'lai_share': [(0.5, 0.5), (0.8, 0.2)],
+    ...                'extinction_coeff': [(0.4, 0.6)],
+    ...                'total_lai': [2, 4]}, processes=1)
+    >>> len(table)
+    8
+    >>> select(table, method='apsim', lai_share=(0.8, 0.2))['rad_intercpt']
+    array([[0.42561243, 0.15960466],
+           [0.60214919, 0.22580595]])
+    """
+    axes = sweep_grid(grid)
+    number_rows = int(np.prod([len(values) for _, values in axes]))
+    chunks = [(axes, start, stop)
+              for start, stop in row_chunks(number_rows, chunk_size)]
+    code = (sweep_dtype, rad_competition_methods)
+    if out_file is None:
+        return np.concatenate(cached_map(store, _sweep_chunk, chunks,
+                                         processes, code))
+    results = cached_imap(store, _sweep_chunk, chunks, processes, code)
+    return write_npy_chunks(
+        out_file, sweep_dtype(len(dict(axes)['lai_share'][0])),
+        (number_rows,),
+        ((start, stop, rows)
+         for (_, start, stop), rows in zip(chunks, results)))
+
+
+def select(table, **criteria):
+    """(array, ...) -> array
+
+    Return the rows of a sweep table matching every axis=value criterion,
+    e.g. select(table, method='cycles', height=(1, 0.5))
+
+    >>> table = sweep({'method': ['apsim'], 'lai_share': [(0.5, 0.5)],
+    ...                'extinction_coeff': [(0.4, 0.6), (0.5, 0.5)],
+    ...                'total_lai': [2]}, processes=1)
+    >>> select(table, extinction_coeff=(0.5, 0.5))['rad_intercpt']
+    array([[0.31606028, 0.31606028]])
+    """
+    rows = np.ones(len(table), dtype=bool)
+    for name, value in criteria.items():
+        if name == 'method':
+            value = SWEEP_METHODS.index(value)
+        matches = table[name] == np.asarray(value,
+                                            dtype=table.dtype[name].base)
+        if matches.ndim > 1:
+            matches = matches.all(axis=-1)
+        rows &= matches
+    return table[rows]
+
+
+def method_names(table):
+    """(array) -> array
+
+    Return the method name of each row of a sweep table
+
+    >>> table = sweep({'method': ['wallace', 'apsim'],
+    ...                'lai_share': [(0.5, 0.5)],
+    ...                'extinction_coeff': [(0.4, 0.6)],
+    ...                'total_lai': [2]}, processes=1)
+    >>> table['method'], method_names(table)
+    (array([2, 0], dtype=uint8), array(['wallace', 'apsim'], dtype='<U7'))
+    """
+    return np.asarray(SWEEP_METHODS)[table['method']]
+
+
+def select_npy(fname, chunk_size=DEFAULT_CHUNK_SIZE, **criteria):
+    """(str, int, ...) -> array
+
+    Return the rows of a sweep table written to a .npy file (see sweep
+    out_file) matching every criterion, see select, reading the file one
+    chunk of chunk_size rows at a time
+
+    >>> import os, tempfile
+    >>> fname = os.path.join(tempfile.mkdtemp(), 'sweep.npy')
+    >>> table = sweep({'method': ['apsim'], 'lai_share': [(0.5, 0.5)],
+    ...                'extinction_coeff': [(0.4, 0.6), (0.5, 0.5)],
+    ...                'total_lai': [2]}, chunk_size=1, processes=1,
+    ...               out_file=fname)
+    >>> select_npy(fname, extinction_coeff=(0.5, 0.5))['rad_intercpt']
+    array([[0.31606028, 0.31606028]])
+    """
+    return np.concatenate([select(rows, **criteria)
+                           for _, rows in iter_npy(fname, chunk_size)])
+
+
+def sweep_curves(table, **criteria):
+    """(array, ...) -> tuple
+
+    Return (total leaf area index, rad intercepted by species 1, by
+    species 2, ...) of the rows of a sweep table matching the criteria, see
+    select
+
+    >>> table = sweep({'method': ['apsim'], 'lai_share': [(0.5, 0.5)],
+    ...                'extinction_coeff': [(0.5, 0.5)],
+    ...                'total_lai': [1, 2]}, processes=1)
+    >>> sweep_curves(table, method='apsim')
+    (array([1., 2.]), array([0.19673467, 0.31606028]), \
+array([0.19673467, 0.31606028]))
+    """
+    rows = select(table, **criteria)
+    return ((rows['leaf_area_index'].sum(axis=1),) +
+            tuple(rows['rad_intercpt'].T))
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+'''Global sensitivity analysis (Sobol and Morris) of the competition
+methods'''
+from __future__ import division
+import numpy as np
+from monte_carlo import evaluate_method
+from parallel import map_chunks, row_chunks
+
+# Design rows evaluated per batched call
+DEFAULT_CHUNK_SIZE = 20000
+
+
+def factor_names(factors):
+    """(list) -> list
+
+    Return labels of factors, e.g. 'leaf_area_index[1]'
+
+    >>> factor_names([('extinction_coeff', 0, 0.3, 0.9),
+    ...               ('atm_transm', None, 0.5, 0.8)])
+    ['extinction_coeff[0]', 'atm_transm']
+    """
+    return [name if species is None else '%s[%d]' % (name, species)
+            for name, species, _, _ in factors]
+
+
+def design_samples(unit_design, factors, base):
+    """(array, list, dict) -> dict
+
+    Return {parameter: samples} for evaluate_method, with the base values
+    of every parameter and the factors set from the design
+
+    unit_design: design rows on the unit hypercube [n_rows, n_factors]
+    factors: (parameter, species index or None, low, high) of each factor,
+     varied uniformly between low and high
+    base: {parameter: value} of the fixed inputs, one value per species for
+     per species parameters
+
+    >>> design_samples(np.array([[0.], [1.]]),
+    ...                [('leaf_area_index', 1, 1, 3)],
+    ...                {'leaf_area_index': [2, 2]})['leaf_area_index']
+    array([[2., 1.],
+           [2., 3.]])
+    """
+    number_rows = len(unit_design)
+    samples = {}
+    for name, value in base.items():
+        value = np.asarray(value, dtype=float)
+        samples[name] = np.broadcast_to(value, (number_rows,) +
+                                        value.shape).copy()
+    for column, (name, species, low, high) in enumerate(factors):
+        assert species is None or name in base, \
+            "Per species factors need a base value of every species"
+        values = low + (high - low) * unit_design[:, column]
+        if species is None:
+            samples[name] = values
+        else:
+            samples[name][:, species] = values
+    return samples
+
+
+def _evaluate_design_chunk(args):
+    """Process pool entry point of evaluate_design"""
+    unit_design, factors, base, method = args
+    return evaluate_method(method, design_samples(unit_design, factors, base))
+
+
+def evaluate_design(unit_design, factors, base, method='cycles',
+                    chunk_size=DEFAULT_CHUNK_SIZE, processes=None):
+    """(array, list, dict, str, int, int) -> array
+
+    Return rad intercepted on each species [n_rows, n_species] at every
+    design row, evaluated with batched calls across a process pool
+
+    method: 'cycles', 'wallace', 'apsim' or 'sub_daily', see
+     monte_carlo.evaluate_method
+    """
+    chunks = [(unit_design[start:stop], factors, base, method)
+              for start, stop in row_chunks(len(unit_design), chunk_size)]
+    return np.concatenate(map_chunks(_evaluate_design_chunk, chunks,
+                                     processes))
+
+
+def latin_hypercube(rng, number_rows, number_factors):
+    """(Generator, int, int) -> array
+
+    Return a Latin hypercube design on the unit hypercube: every factor has
+    one row in each of number_rows equal strata
+
+    >>> design = latin_hypercube(np.random.default_rng(0), 4, 2)
+    >>> np.sort(np.floor(design * 4), axis=0)
+    array([[0., 0.],
+           [1., 1.],
+           [2., 2.],
+           [3., 3.]])
+    """
+    strata = np.argsort(rng.random((number_rows, number_factors)), axis=0)
+    return (strata + rng.random((number_rows, number_factors))) / number_rows
+
+
+def saltelli_design(number_samples, number_factors, seed=0):
+    """(int, int, int) -> array
+
+    Return the Saltelli design [number_samples * (number_factors + 2),
+    number_factors]: matrices A, B, then for every factor i the matrix A
+    with column i taken from B
+
+    Reference: Saltelli, A., Annoni, P., Azzini, I., Campolongo, F.,
+     Ratto, M., Tarantola, S., 2010. Variance based sensitivity analysis of
+     model output. Computer Physics Communications 181, 259-270.
+    """
+    rng = np.random.default_rng(seed)
+    matrix_a = latin_hypercube(rng, number_samples, number_factors)
+    matrix_b = latin_hypercube(rng, number_samples, number_factors)
+    matrices_ab = np.repeat(matrix_a[None], number_factors, axis=0)
+    for i in range(number_factors):
+        matrices_ab[i, :, i] = matrix_b[:, i]
+    return np.concatenate([matrix_a, matrix_b] + list(matrices_ab))
+
+
+def sobol_from_outputs(outputs, number_factors):
+    """(array, int) -> (array, array)
+
+    Return first order and total Sobol indices [n_factors, ...] from the
+    outputs of a saltelli_design, with the Saltelli (2010) first order and
+    Jansen total estimators
+
+    >>> design = saltelli_design(20000, 2)
+    >>> first_order, total = sobol_from_outputs(design[:, 0] +
+    ...                                         2 * design[:, 1], 2)
+    >>> first_order.round(1), total.round(1)
+    (array([0.2, 0.8]), array([0.2, 0.8]))
+    """
+    outputs = np.asarray(outputs, dtype=float)
+    outputs = outputs.reshape((number_factors + 2, -1) + outputs.shape[1:])
+    output_a, output_b, outputs_ab = outputs[0], outputs[1], outputs[2:]
+    variance = np.concatenate([output_a, output_b]).var(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first_order = ((output_b * (outputs_ab - output_a)).mean(axis=1) /
+                       variance)
+        total = ((output_a - outputs_ab) ** 2).mean(axis=1) / 2 / variance
+    return first_order, total
+
+
+def sobol_indices(factors, base, method='cycles', number_samples=10000,
+                  seed=0, chunk_size=DEFAULT_CHUNK_SIZE, processes=None):
+    """(list, dict, str, int, int, int, int) -> dict
+
+    Return first order and total Sobol indices [n_factors, n_species] of the
+    rad intercepted by each species, from number_samples * (n_factors + 2)
+    batched evaluations of the method
+
+    factors: (parameter, species index or None, low, high) of each factor,
+     see design_samples
+    base: {parameter: value} of the fixed inputs
+    method: 'cycles', 'wallace', 'apsim' or 'sub_daily'
+
+    >>> indices = sobol_indices(
+    ...     [('extinction_coeff', 0, 0.4, 0.7),
+    ...      ('leaf_area_index', 0, 0.5, 3),
+    ...      ('leaf_area_index', 1, 0.5, 3)],
+    ...     {'extinction_coeff': [0.5, 0.5], 'leaf_area_index': [2, 2]},
+    ...     method='apsim', number_samples=5000, processes=1)
+    >>> indices['names']
+    ['extinction_coeff[0]', 'leaf_area_index[0]', 'leaf_area_index[1]']
+    >>> indices['total'].round(2)
+    array([[0.09, 0.02],
+           [0.77, 0.18],
+           [0.15, 0.84]])
+    """
+    design = saltelli_design(number_samples, len(factors), seed)
+    outputs = evaluate_design(design, factors, base, method, chunk_size,
+                              processes)
+    first_order, total = sobol_from_outputs(outputs, len(factors))
+    return {'names': factor_names(factors),
+            'first_order': first_order,
+            'total': total,
+            'evaluations': len(design)}
+
+
+def morris_design(trajectories, number_factors, levels=4, seed=0):
+    """(int, int, int, int) -> (array, array, array)
+
+    Return Morris one at a time trajectories on a grid of levels: the design
+    [trajectories * (number_factors + 1), number_factors], the factor moved
+    at each step and the signed step size [trajectories, number_factors]
+
+    Steps are delta = levels / (2 * (levels - 1)), up from the lower half
+    of the grid and down from the upper half, in random factor order.
+
+    Reference: Morris, M.D., 1991. Factorial sampling plans for preliminary
+     computational experiments. Technometrics 33, 161-174.
+    """
+    assert levels >= 2 and levels % 2 == 0
+    rng = np.random.default_rng(seed)
+    delta = levels / (2 * (levels - 1))
+    design = np.zeros((trajectories, number_factors + 1, number_factors))
+    moved = np.zeros((trajectories, number_factors), dtype=int)
+    steps = np.zeros((trajectories, number_factors))
+    for t in range(trajectories):
+        point = rng.integers(0, levels, number_factors) / (levels - 1)
+        design[t, 0] = point
+        moved[t] = rng.permutation(number_factors)
+        for step, i in enumerate(moved[t]):
+            steps[t, step] = delta if point[i] + delta <= 1 else -delta
+            point = point.copy()
+            point[i] += steps[t, step]
+            design[t, step + 1] = point
+    return design.reshape(-1, number_factors), moved, steps
+
+
+def morris_indices(factors, base, method='cycles', trajectories=100,
+                   levels=4, seed=0, chunk_size=DEFAULT_CHUNK_SIZE,
+                   processes=None):
+    """(list, dict, str, int, int, int, int, int) -> dict
+
+    Return the Morris screening measures mu, mu_star (mean absolute
+    elementary effect) and sigma [n_factors, n_species] of the rad
+    intercepted by each species, from trajectories * (n_factors + 1)
+    batched evaluations. Elementary effects are per unit of the factor
+    range.
+
+    >>> indices = morris_indices(
+    ...     [('extinction_coeff', 0, 0.4, 0.7),
+    ...      ('leaf_area_index', 0, 0.5, 3),
+    ...      ('height', 0, 0.2, 1)],
+    ...     {'extinction_coeff': [0.5, 0.5], 'leaf_area_index': [2, 2],
+    ...      'height': [0.6, 0.6]}, processes=1)
+    >>> indices['mu_star'].round(3)
+    array([[0.122, 0.06 ],
+           [0.391, 0.185],
+           [0.135, 0.135]])
+    """
+    number_factors = len(factors)
+    design, moved, steps = morris_design(trajectories, number_factors,
+                                         levels, seed)
+    outputs = evaluate_design(design, factors, base, method, chunk_size,
+                              processes)
+    outputs = outputs.reshape((trajectories, number_factors + 1) +
+                              outputs.shape[1:])
+    effects = np.zeros((number_factors, trajectories) + outputs.shape[2:])
+    for t in range(trajectories):
+        differences = np.diff(outputs[t], axis=0)
+        effects[moved[t], t] = (differences /
+                                steps[t].reshape((-1,) + (1,) *
+                                                 (differences.ndim - 1)))
+    return {'names': factor_names(factors),
+            'mu': effects.mean(axis=1),
+            'mu_star': np.abs(effects).mean(axis=1),
+            'sigma': effects.std(axis=1),
+            'evaluations': len(design)}
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
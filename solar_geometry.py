@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+'''Solar position: zenith angles and daylength for sub daily interception'''
+from __future__ import division
+import functools
+import math
+import numpy as np
+from rad_competition_methods import SkyGrid
+
+# Maximum number of (latitude, day of year) angle grids kept in memory
+DAY_ANGLES_CACHE_SIZE = 4096
+
+
+def solar_declination(day_of_year):
+    """(array) -> array
+
+    Return solar declination [rad]
+
+    day_of_year: day of year [1-366]
+
+    Reference: Campbell, G. S., and J. M. Norman. 1998. Introduction to
+     environmental biophysics. Springer, New York. Eq. 11.2
+
+    >>> solar_declination(np.array([172, 355]))
+    array([ 0.40909978, -0.40900529])
+    """
+    DEG_TO_RAD = math.pi / 180.
+    day_of_year = np.asarray(day_of_year, dtype=float)
+    return np.arcsin(0.39785 * np.sin(
+        (278.97 + 0.9856 * day_of_year + 1.9165 *
+         np.sin((356.6 + 0.9856 * day_of_year) * DEG_TO_RAD)) * DEG_TO_RAD))
+
+
+def solar_zenith_angle(latitude, day_of_year, hour):
+    """(array, array, array) -> array
+
+    Return solar zenith angle [deg], inputs are broadcast against each other
+
+    latitude: [deg], negative south
+    day_of_year: day of year [1-366]
+    hour: local solar time [h], solar noon at 12
+
+    Reference: Campbell, G. S., and J. M. Norman. 1998. Introduction to
+     environmental biophysics. Springer, New York. Eq. 11.1
+
+    >>> solar_zenith_angle(40, 172, np.array([6, 12, 18]))
+    array([75.18550505, 16.5603092 , 75.18550505])
+    """
+    DEG_TO_RAD = math.pi / 180.
+    latitude = np.asarray(latitude, dtype=float) * DEG_TO_RAD
+    assert (np.abs(latitude) <= math.pi / 2).all()
+    declination = solar_declination(day_of_year)
+    hour_angle = 15 * (np.asarray(hour, dtype=float) - 12) * DEG_TO_RAD
+    cos_zenith = (np.sin(latitude) * np.sin(declination) +
+                  np.cos(latitude) * np.cos(declination) * np.cos(hour_angle))
+    return np.degrees(np.arccos(np.clip(cos_zenith, -1, 1)))
+
+
+def daylength(latitude, day_of_year):
+    """(array, array) -> array
+
+    Return daylength [h], inputs are broadcast against each other. Polar
+     night is 0 and polar day 24 h.
+
+    latitude: [deg], negative south
+    day_of_year: day of year [1-366]
+
+    Reference: Campbell, G. S., and J. M. Norman. 1998. Introduction to
+     environmental biophysics. Springer, New York. Eq. 11.6
+
+    >>> daylength(np.array([0, 40, 80]), 172)
+    array([12.        , 14.84450974, 24.        ])
+    """
+    DEG_TO_RAD = math.pi / 180.
+    latitude = np.asarray(latitude, dtype=float) * DEG_TO_RAD
+    declination = solar_declination(day_of_year)
+    cos_half_day = np.clip(-np.tan(latitude) * np.tan(declination), -1, 1)
+    return 2 * np.degrees(np.arccos(cos_half_day)) / 15
+
+
+def zenith_angle_grid(latitude, day_of_year, step_hours=1.):
+    """(array, array, float) -> array
+
+    Return solar zenith angles [deg] at the middle of each step_hours
+     interval of the day, on a new last axis. latitude and day_of_year are
+     broadcast against each other, e.g. sites[:, None] and days[None, :]
+     give [sites, days, steps]. Night time angles are clipped to 90 deg,
+     where beam and diffuse fractions are nil, so the whole grid can be fed
+     to SkyGrid and the sub daily engine.
+
+    latitude: [deg], negative south
+    day_of_year: day of year [1-366]
+    step_hours: time step [h]
+
+    >>> zenith_angle_grid(40, 172, 6)
+    array([90.        , 41.17814234, 41.17814234, 90.        ])
+    """
+    assert step_hours > 0
+    hour = (np.arange(int(round(24 / step_hours))) + 0.5) * step_hours
+    latitude = np.asarray(latitude, dtype=float)[..., None]
+    day_of_year = np.asarray(day_of_year, dtype=float)[..., None]
+    return np.minimum(solar_zenith_angle(latitude, day_of_year, hour), 90.)
+
+
+@functools.lru_cache(maxsize=DAY_ANGLES_CACHE_SIZE)
+def day_zenith_angles(latitude, day_of_year, step_hours=1.):
+    """(float, int, float) -> array
+
+    Return solar zenith angles [deg] of the daylight steps of one day, with
+     results cached per (latitude, day_of_year, step_hours)
+
+    latitude: [deg], negative south
+    day_of_year: day of year [1-366]
+    step_hours: time step [h]
+
+    >>> day_zenith_angles(40, 172, 2)
+    array([85.76860992, 64.04939637, 41.17814234, 20.84090747, 20.84090747,
+           41.17814234, 64.04939637, 85.76860992])
+    """
+    angles_deg = zenith_angle_grid(latitude, day_of_year, step_hours)
+    angles_deg = angles_deg[angles_deg < 90]
+    angles_deg.flags.writeable = False
+    return angles_deg
+
+
+def day_sky_grid(latitude, day_of_year, atm_press, atm_transm,
+                 step_hours=1.):
+    """(float, int, float, float, float) -> SkyGrid
+
+    Return the SkyGrid of the daylight hours of one day at one site. On
+     polar night days the grid has no angles, and sub daily interception
+     under it is 0 for every species.
+
+    latitude: [deg], negative south
+    day_of_year: day of year [1-366]
+    atm_press: atmospheric pressure [kPa]
+    atm_transm: atmospheric transmission [0-1]
+    step_hours: time step [h]
+
+    >>> sky = day_sky_grid(40, 172, 101.3, 0.75, step_hours=2)
+    >>> sky.angles_deg.shape
+    (8,)
+    >>> from rad_competition_methods import rad_intercpt_sub_daily_species
+    >>> polar_night = day_sky_grid(80, 1, 101.3, 0.75)
+    >>> polar_night.angles_deg.shape, float(polar_night.total_intercpt.sum())
+    ((0,), 0.0)
+    >>> rad_intercpt_sub_daily_species(0.8, [1., 2.], [1., 2.], polar_night)
+    array([0., 0.])
+    """
+    return SkyGrid(day_zenith_angles(latitude, day_of_year, step_hours),
+                   atm_press, atm_transm)
+
+
+def season_sky_grid(latitude, day_of_year, atm_press, atm_transm,
+                    step_hours=1.):
+    """(array, array, array, array, float) -> SkyGrid
+
+    Return one SkyGrid holding the skies of many sites and days, angles on
+     the last axis and night steps at 90 deg. Inputs are broadcast against
+     each other, e.g. latitude[:, None] with day_of_year[None, :] and
+     atm_transm[:, None] gives skies of shape [sites, days, steps] that
+     rad_intercpt_sub_daily_species computes in bulk.
+
+    latitude: [deg], negative south
+    day_of_year: day of year [1-366]
+    atm_press: atmospheric pressure [kPa]
+    atm_transm: atmospheric transmission [0-1]
+    step_hours: time step [h]
+
+    >>> sky = season_sky_grid(np.array([0, 40])[:, None], np.arange(1, 366),
+    ...                       101.3, 0.75)
+    >>> sky.angles_deg.shape
+    (2, 365, 24)
+    >>> from rad_competition_methods import rad_intercpt_sub_daily_species
+    >>> rad_intercpt_sub_daily_species(
+    ...     0.8, [1., 2.], [1., 2.], season_sky_grid(
+    ...         np.array([80, 40])[:, None], np.array([1, 172]), 101.3,
+    ...         0.75)).round(4)
+    array([[[0.    , 0.    ],
+            [0.3341, 0.6093]],
+    <BLANKLINE>
+           [[0.3504, 0.6077],
+            [0.2649, 0.6107]]])
+    """
+    return SkyGrid(zenith_angle_grid(latitude, day_of_year, step_hours),
+                   np.asarray(atm_press, dtype=float)[..., None],
+                   np.asarray(atm_transm, dtype=float)[..., None])
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()